@@ -0,0 +1,64 @@
+import hashlib
+from typing import Any, AsyncIterator, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson (datetimes, UUIDs and models included)."""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode()
+    return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response serialized in a single pass.
+    Pydantic models go straight through pydantic-core's serializer and anything
+    else through orjson. Returning this from a route also skips FastAPI's
+    response_model re-validation, so a model built once is serialized once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag (the body may be gzip-encoded) from the values that version a resource."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+def _encode_line(item: Any) -> bytes:
+    return dumps(item) + b"\n"
+
+async def ndjson_response(items: AsyncIterator[Any]) -> StreamingResponse:
+    """
+    Stream items as newline-delimited JSON.
+    The first item is pulled eagerly so that errors raised while opening the
+    source still turn into a proper HTTP status instead of a truncated body.
+    """
+    iterator = items.__aiter__()
+    try:
+        first = [await iterator.__anext__()]
+    except StopAsyncIteration:
+        first = []
+
+    async def body():
+        for item in first:
+            yield _encode_line(item)
+        async for item in iterator:
+            yield _encode_line(item)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,51 @@
+import hashlib
+import math
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+def optimal_parameters(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """Bit count and hash count giving `error_rate` false positives at `capacity` items."""
+    capacity = max(capacity, 1)
+    num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return num_bits, num_hashes
+
+def expected_error_rate(num_bits: int, num_hashes: int, count: int) -> float:
+    """False positive rate of a filter holding `count` items."""
+    return (1 - math.exp(-num_hashes * count / num_bits)) ** num_hashes
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives.
+    Positions come from one BLAKE2b digest split into two 64-bit halves
+    (Kirsch-Mitzenmacher double hashing), so a lookup hashes the item once.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[Union[bytearray, memoryview]] = None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float, items: Iterable[Union[str, bytes]] = ()) -> "BloomFilter":
+        bloom = cls(*optimal_parameters(capacity, error_rate))
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: Union[str, bytes]) -> Iterator[int]:
+        data = item.encode() if isinstance(item, str) else item
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: Union[str, bytes]):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: Union[str, bytes]) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
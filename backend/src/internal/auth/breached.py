@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from typing import Optional, Tuple
+
+from internal.auth.bloom import BloomFilter, expected_error_rate
+from internal.config.config import BREACHED_PASSWORDS_FILE
+
+logger = logging.getLogger(__name__)
+
+# File layout: this header, then the filter's bit array
+MAGIC = b"PWBLOOM1"
+HEADER = struct.Struct("<8sQIQ4x")  # magic, bit count, hash count, item count
+
+def password_digest(password: str) -> bytes:
+    """Item stored in the filter for a password: its SHA-1, as in breach corpora."""
+    return hashlib.sha1(password.encode()).digest()
+
+def create_filter_file(path: str, num_bits: int, num_hashes: int) -> Tuple[BloomFilter, mmap.mmap]:
+    """Create an empty filter file of the right size and map it for writing."""
+    with open(path, "wb") as f:
+        f.truncate(HEADER.size + (num_bits + 7) // 8)
+    with open(path, "r+b") as f:
+        mapped = mmap.mmap(f.fileno(), 0)
+    bloom = BloomFilter(num_bits, num_hashes, memoryview(mapped)[HEADER.size:])
+    return bloom, mapped
+
+def finish_filter_file(bloom: BloomFilter, mapped: mmap.mmap):
+    """Write the header once every item was added, and flush the mapping."""
+    mapped[:HEADER.size] = HEADER.pack(MAGIC, bloom.num_bits, bloom.num_hashes, bloom.count)
+    mapped.flush()
+
+def open_filter_file(path: str) -> BloomFilter:
+    """
+    Map a filter file read-only. Nothing is read upfront: pages come from the
+    page cache on lookup, shared by every worker mapping the same file.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, num_bits, num_hashes, count = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a breached password filter")
+    if len(mapped) < HEADER.size + (num_bits + 7) // 8:
+        raise ValueError(f"{path} is truncated")
+    bloom = BloomFilter(num_bits, num_hashes, memoryview(mapped)[HEADER.size:])
+    bloom.count = count
+    return bloom
+
+class BreachedPasswords:
+    """
+    Offline check of passwords against a breach corpus.
+    The filter may report a password that was never breached (at its false
+    positive rate), never the reverse. reload() swaps in a new file when the
+    path was replaced, e.g. by the compile tool's atomic rename; the old
+    mapping goes away once no lookup uses it anymore.
+    """
+
+    def __init__(self, path: str = BREACHED_PASSWORDS_FILE):
+        self.path = path
+        self._filter: Optional[BloomFilter] = None
+        self._file_id: Optional[tuple] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def is_breached(self, password: str) -> bool:
+        bloom = self._filter
+        return bloom is not None and password_digest(password) in bloom
+
+    def reload(self):
+        """Map the file if it changed since the last load."""
+        if not self.enabled:
+            return
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Warn once, not on every reload
+            if self._file_id != ():
+                logger.warning(f"Breached password filter {self.path} not found, the check is off")
+            self._filter = None
+            self._file_id = ()
+            return
+        file_id = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if file_id == self._file_id:
+            return
+        self._filter = open_filter_file(self.path)
+        self._file_id = file_id
+        logger.info(f"Loaded breached password filter {self.path} ({self._filter.count} passwords)")
+
+    async def refresh(self):
+        # Only maps the file, cheap enough for the event loop
+        self.reload()
+
+    def status(self) -> dict:
+        bloom = self._filter
+        if bloom is None:
+            return {"enabled": self.enabled, "loaded": False}
+        return {
+            "enabled": True,
+            "loaded": True,
+            "passwords": bloom.count,
+            "size_bytes": (bloom.num_bits + 7) // 8,
+            "expected_error_rate": expected_error_rate(bloom.num_bits, bloom.num_hashes, bloom.count),
+        }
+
+breached_passwords = BreachedPasswords()
@@ -0,0 +1,167 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from internal.config.config import (
+    GRAPH_API_BASE_URL,
+    GRAPH_BATCH_CONCURRENCY,
+    GRAPH_MAX_RETRIES,
+    GRAPH_REQUEST_TIMEOUT,
+)
+
+# Status codes Graph asks us to retry after backing off
+RETRYABLE_STATUS_CODES = {429, 503, 504}
+# Maximum number of sub-requests in one JSON $batch request
+BATCH_MAX_REQUESTS = 20
+
+class GraphError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+# Shared client so paginated calls reuse the same TLS connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client used for Microsoft Graph calls."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=GRAPH_REQUEST_TIMEOUT)
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def graph_url(path: str) -> str:
+    """Build an absolute Graph URL from a path such as '/groups'."""
+    return f"{GRAPH_API_BASE_URL}{path}"
+
+def retry_after_seconds(headers: Any, default: float = 1.0) -> float:
+    """Read the Retry-After delay (in seconds) from response headers."""
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+async def graph_request(
+    method: str,
+    token: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    json: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Send a Graph request, backing off on throttling responses."""
+    headers = {"Authorization": f"Bearer {token}"}
+    client = get_http_client()
+
+    for attempt in range(GRAPH_MAX_RETRIES + 1):
+        response = await client.request(method, url, headers=headers, params=params, json=json)
+        if response.status_code in RETRYABLE_STATUS_CODES and attempt < GRAPH_MAX_RETRIES:
+            await asyncio.sleep(retry_after_seconds(response.headers, default=2 ** attempt))
+            continue
+        if response.status_code != 200:
+            raise GraphError(response.status_code, f"Graph request failed: {response.text}")
+        return response.json()
+
+async def graph_get(token: str, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """GET a Graph resource."""
+    return await graph_request("GET", token, url, params=params)
+
+async def graph_post(token: str, url: str, json: Dict[str, Any]) -> Dict[str, Any]:
+    """POST a JSON body to a Graph endpoint."""
+    return await graph_request("POST", token, url, json=json)
+
+async def iter_graph_pages(
+    token: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield each page of a Graph collection, following @odata.nextLink."""
+    next_url = url
+    while next_url:
+        page = await graph_get(token, next_url, params)
+        yield page
+        next_url = page.get("@odata.nextLink")
+        # The next link already carries the original query string
+        params = None
+
+async def iter_graph_items(
+    token: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_items: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the items of a Graph collection one page at a time, up to max_items."""
+    count = 0
+    async for page in iter_graph_pages(token, url, params):
+        for item in page.get("value", []):
+            if max_items is not None and count >= max_items:
+                return
+            yield item
+            count += 1
+        # Stop before fetching a page we would not use
+        if max_items is not None and count >= max_items:
+            return
+
+async def _send_batch(token: str, requests: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """Send one JSON $batch request and index the sub-responses by id."""
+    body = {
+        "requests": [
+            {"id": request_id, "method": "GET", "url": url}
+            for request_id, url in requests
+        ]
+    }
+    result = await graph_post(token, graph_url("/$batch"), body)
+    return {response["id"]: response for response in result.get("responses", [])}
+
+async def graph_batch_get(
+    token: str,
+    requests: Dict[str, str],
+    concurrency: int = GRAPH_BATCH_CONCURRENCY
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run many GET requests through Graph JSON batching.
+    `requests` maps an id to a URL relative to the API version (e.g. '/groups/{id}/members').
+    Requests are packed 20 per batch, batches run concurrently up to `concurrency`,
+    and throttled sub-requests are retried after their Retry-After delay.
+    Returns the sub-responses ({"status", "headers", "body"}) indexed by id.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    async def run_batch(pending: List[Tuple[str, str]]):
+        for attempt in range(GRAPH_MAX_RETRIES + 1):
+            async with semaphore:
+                responses = await _send_batch(token, pending)
+
+            throttled = []
+            delay = 0.0
+            for request_id, url in pending:
+                response = responses.get(request_id)
+                if response is None:
+                    response = {"status": 502, "body": {"error": {"message": "Missing batch response"}}}
+                if response["status"] in RETRYABLE_STATUS_CODES and attempt < GRAPH_MAX_RETRIES:
+                    throttled.append((request_id, url))
+                    delay = max(delay, retry_after_seconds(response.get("headers") or {}, default=2 ** attempt))
+                else:
+                    results[request_id] = response
+
+            if not throttled:
+                return
+            # Only the throttled sub-requests are sent again
+            await asyncio.sleep(delay)
+            pending = throttled
+
+    items = list(requests.items())
+    await asyncio.gather(*(
+        run_batch(items[start:start + BATCH_MAX_REQUESTS])
+        for start in range(0, len(items), BATCH_MAX_REQUESTS)
+    ))
+    return results
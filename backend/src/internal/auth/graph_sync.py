@@ -0,0 +1,162 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from internal.auth.graph import GraphError, graph_post, graph_url, iter_graph_pages
+from internal.database.database import AsyncSessionLocal
+from internal.database.models import utcnow, GraphGroup, GraphGroupMember, GraphSyncState
+
+logger = logging.getLogger(__name__)
+
+# Name of the sync state row holding the group membership delta link
+MEMBERSHIP_SYNC_STATE = "group_memberships"
+# Advisory lock key so that only one worker runs the sync at a time
+MEMBERSHIP_SYNC_LOCK_ID = 0x6D656D62
+# Graph resolves at most 1000 ids per getByIds call
+GET_BY_IDS_MAX = 1000
+# HTTP status returned by Graph when a delta link has expired
+DELTA_EXPIRED_STATUS = 410
+
+async def get_membership_sync_state(db: AsyncSession) -> Optional[GraphSyncState]:
+    """Get the sync state of the local group membership store."""
+    return await db.get(GraphSyncState, MEMBERSHIP_SYNC_STATE)
+
+def staleness_seconds(state: Optional[GraphSyncState]) -> Optional[float]:
+    """Seconds elapsed since the last successful sync, None if never synced."""
+    if state is None or state.last_synced_at is None:
+        return None
+    return (utcnow() - state.last_synced_at).total_seconds()
+
+async def _resolve_members(token: str, member_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch the display properties of directory objects added by a delta page."""
+    resolved = {}
+    for start in range(0, len(member_ids), GET_BY_IDS_MAX):
+        chunk = member_ids[start:start + GET_BY_IDS_MAX]
+        result = await graph_post(token, graph_url("/directoryObjects/getByIds"), {"ids": chunk})
+        for obj in result.get("value", []):
+            resolved[obj["id"]] = obj
+    return resolved
+
+async def _apply_delta_page(db: AsyncSession, token: str, groups: List[Dict[str, Any]]):
+    """Apply one page of /groups/delta to the local store."""
+    # Membership changes of the page, the last one of each (group, member) wins:
+    # the member's delta entry when added, None when removed
+    changes: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+    for group in groups:
+        group_id = group["id"]
+        if "@removed" in group:
+            await db.execute(delete(GraphGroup).where(GraphGroup.id == group_id))
+            # Its members went with it (ON DELETE CASCADE), earlier changes no longer apply
+            for key in [key for key in changes if key[0] == group_id]:
+                del changes[key]
+            continue
+
+        # Delta pages only carry the properties that changed
+        values = {"id": group_id, "synced_at": utcnow()}
+        if "displayName" in group:
+            values["display_name"] = group["displayName"]
+        if "description" in group:
+            values["description"] = group["description"]
+        stmt = insert(GraphGroup).values(**values)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[GraphGroup.id],
+            set_={key: stmt.excluded[key] for key in values if key != "id"}
+        ))
+
+        for member in group.get("members@delta", []):
+            changes[(group_id, member["id"])] = None if "@removed" in member else member
+
+    removed = [key for key, member in changes.items() if member is None]
+    if removed:
+        await db.execute(delete(GraphGroupMember).where(
+            tuple_(GraphGroupMember.group_id, GraphGroupMember.member_id).in_(removed)
+        ))
+
+    # One row per (group, member), a single upsert cannot touch the same row twice
+    added = [(group_id, member) for (group_id, _), member in changes.items() if member is not None]
+    if not added:
+        return
+
+    # Membership deltas only carry ids, resolve the rest in bulk
+    details = await _resolve_members(token, list({member["id"] for _, member in added}))
+    rows = []
+    for group_id, member in added:
+        detail = details.get(member["id"], {})
+        rows.append({
+            "group_id": group_id,
+            "member_id": member["id"],
+            "member_type": member.get("@odata.type") or detail.get("@odata.type"),
+            "display_name": detail.get("displayName"),
+            "mail": detail.get("mail"),
+            "user_principal_name": detail.get("userPrincipalName"),
+            "synced_at": utcnow()
+        })
+    stmt = insert(GraphGroupMember).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[GraphGroupMember.group_id, GraphGroupMember.member_id],
+        set_={
+            "member_type": stmt.excluded.member_type,
+            "display_name": stmt.excluded.display_name,
+            "mail": stmt.excluded.mail,
+            "user_principal_name": stmt.excluded.user_principal_name,
+            "synced_at": stmt.excluded.synced_at
+        }
+    ))
+
+async def _run_delta(db: AsyncSession, token: str, state: GraphSyncState):
+    """Walk a delta round from the stored link (or from scratch) and store the next link."""
+    full_sync = state.delta_link is None
+    if full_sync:
+        # A full round rebuilds the store, stale rows must not survive it
+        await db.execute(delete(GraphGroupMember))
+        await db.execute(delete(GraphGroup))
+        url = graph_url("/groups/delta")
+        params = {"$select": "displayName,description,members"}
+    else:
+        url, params = state.delta_link, None
+
+    async for page in iter_graph_pages(token, url, params):
+        await _apply_delta_page(db, token, page.get("value", []))
+        if "@odata.deltaLink" in page:
+            state.delta_link = page["@odata.deltaLink"]
+
+    state.last_synced_at = utcnow()
+    if full_sync:
+        state.last_full_sync_at = state.last_synced_at
+
+async def sync_group_memberships(token_provider: Callable[[], Awaitable[str]]) -> bool:
+    """
+    Bring the local group membership store up to date.
+    The first run does a full delta round, later runs only fetch the changes
+    since the stored delta link. Returns False if another worker holds the lock.
+    """
+    async with AsyncSessionLocal() as db:
+        locked = (await db.execute(select(func.pg_try_advisory_xact_lock(MEMBERSHIP_SYNC_LOCK_ID)))).scalar()
+        if not locked:
+            await db.rollback()
+            return False
+
+        state = await get_membership_sync_state(db)
+        if state is None:
+            state = GraphSyncState(name=MEMBERSHIP_SYNC_STATE)
+            db.add(state)
+
+        token = await token_provider()
+        try:
+            await _run_delta(db, token, state)
+        except GraphError as e:
+            if e.status_code != DELTA_EXPIRED_STATUS or state.delta_link is None:
+                raise
+            # The delta link expired, start over with a full round
+            logger.warning("Graph delta link expired, running a full membership sync")
+            await db.rollback()
+            await db.execute(select(func.pg_advisory_xact_lock(MEMBERSHIP_SYNC_LOCK_ID)))
+            state = await get_membership_sync_state(db)
+            state.delta_link = None
+            await _run_delta(db, token, state)
+
+        await db.commit()
+        return True
@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from jose import jwk
+
+from internal.config.config import (
+    JWT_ALGORITHM,
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES,
+    JWT_KEYS_DIR,
+    JWT_KEYS_RELOAD_SECONDS,
+    JWT_KEY_ACTIVATION_DELAY_SECONDS,
+)
+
+# Algorithms signed with a private key and verified with a published public key
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+# Tokens stay valid this long after their signing key stops being used
+KEY_RETIREMENT_OVERLAP_SECONDS = JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+# Kids made by tools/jwt_keys.py start with their UTC creation time
+KID_PATTERN = re.compile(r"^(\d{14})-[0-9a-f]+$")
+
+def kid_created_at(kid: str, path: str) -> float:
+    """
+    Creation time of a key, from its kid. File times change with copies,
+    mounts and image builds, so mtime is only a fallback for other kids.
+    """
+    match = KID_PATTERN.match(kid)
+    if match:
+        return datetime.strptime(match.group(1), "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc).timestamp()
+    return os.stat(path).st_mtime
+
+class SigningKey:
+    def __init__(self, kid: str, path: str, private_pem: str, algorithm: str, created_at: float):
+        self.kid = kid
+        self.path = path
+        self.private_pem = private_pem
+        self.created_at = created_at
+        self.algorithm = algorithm
+        key = jwk.construct(private_pem, algorithm)
+        self.public_pem = key.public_key().to_pem().decode()
+        self.public_jwk = {
+            **key.public_key().to_dict(),
+            "kid": kid,
+            "use": "sig",
+            "alg": algorithm
+        }
+
+    def activates_at(self, activation_delay: float) -> float:
+        return self.created_at + activation_delay
+
+def load_signing_keys(keys_dir: str, algorithm: str) -> List[SigningKey]:
+    """Load every <kid>.pem private key of a directory, oldest first."""
+    keys = []
+    if not os.path.isdir(keys_dir):
+        return keys
+    for filename in os.listdir(keys_dir):
+        if not filename.endswith(".pem"):
+            continue
+        path = os.path.join(keys_dir, filename)
+        with open(path) as f:
+            private_pem = f.read()
+        kid = filename[:-len(".pem")]
+        keys.append(SigningKey(
+            kid=kid,
+            path=path,
+            private_pem=private_pem,
+            algorithm=algorithm,
+            created_at=kid_created_at(kid, path)
+        ))
+    return sorted(keys, key=lambda key: key.created_at)
+
+def select_signing_key(keys: List[SigningKey], now: float, activation_delay: float) -> Optional[SigningKey]:
+    """Pick the newest key past its activation delay, or the oldest one while none is."""
+    active = [key for key in keys if key.activates_at(activation_delay) <= now]
+    if active:
+        return active[-1]
+    return keys[0] if keys else None
+
+def retired_keys(keys: List[SigningKey], now: float, activation_delay: float, overlap: float) -> List[SigningKey]:
+    """
+    Keys that can be deleted: they were superseded by a newer active key longer
+    ago than `overlap`, so no token they signed is still valid.
+    """
+    retired = []
+    for key, successor in zip(keys, keys[1:]):
+        superseded_at = successor.activates_at(activation_delay)
+        if superseded_at + overlap <= now:
+            retired.append(key)
+    return retired
+
+class SigningKeyRing:
+    """
+    Asymmetric JWT keys loaded from a directory.
+    Every key in the directory is published in the JWKS; the newest key whose
+    activation delay has elapsed signs new tokens. Rotating is dropping a new
+    key file in the directory, each worker picks it up on its next reload.
+    """
+
+    def __init__(
+        self,
+        keys_dir: str = JWT_KEYS_DIR,
+        algorithm: str = JWT_ALGORITHM,
+        activation_delay: float = JWT_KEY_ACTIVATION_DELAY_SECONDS,
+        reload_seconds: float = JWT_KEYS_RELOAD_SECONDS
+    ):
+        self.keys_dir = keys_dir
+        self.algorithm = algorithm
+        self.activation_delay = activation_delay
+        self.reload_seconds = reload_seconds
+        self._keys: List[SigningKey] = []
+        self._by_kid: Dict[str, SigningKey] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._keys and now - self._loaded_at < self.reload_seconds:
+            return
+        with self._lock:
+            if self._keys and now - self._loaded_at < self.reload_seconds:
+                return
+            keys = load_signing_keys(self.keys_dir, self.algorithm)
+            if not keys:
+                raise RuntimeError(f"No JWT signing key found in '{self.keys_dir}'")
+            self._keys = keys
+            self._by_kid = {key.kid: key for key in keys}
+            self._loaded_at = now
+
+    def signing_key(self) -> SigningKey:
+        """Get the key used to sign new tokens."""
+        self._refresh()
+        return select_signing_key(self._keys, time.time(), self.activation_delay)
+
+    def verification_key(self, kid: Optional[str]) -> Optional[str]:
+        """Get the public key matching a token's kid."""
+        self._refresh()
+        key = self._by_kid.get(kid)
+        return key.public_pem if key else None
+
+    def jwks(self) -> dict:
+        """Get the published JSON Web Key Set."""
+        self._refresh()
+        return {"keys": [key.public_jwk for key in self._keys]}
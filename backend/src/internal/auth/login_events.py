@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter, deque
+from typing import List, Optional
+
+import asyncpg
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+
+from internal.config.config import LOGIN_EVENTS_BATCH_SIZE, LOGIN_EVENTS_BUFFER_SIZE, LOGIN_EVENTS_FLUSH_SECONDS
+from internal.database.database import engine
+from internal.database.models import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Column order of the buffered tuples, as copied into login_events
+COLUMNS = ["user_id", "provider", "ip_address", "user_agent", "logged_at"]
+USER_AGENT_MAX_LENGTH = 512
+# Longest a shutdown waits for the buffer to be written
+DRAIN_TIMEOUT_SECONDS = 10
+# Failures of the data itself, retrying the same events would fail forever.
+# Anything else (unreachable, restarting, timed out, lock contention) is retried later.
+PERMANENT_ERRORS = (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError)
+
+# Latest login of each user in the batch, never moving last_login_at backwards
+UPDATE_LAST_LOGIN = """
+UPDATE users SET last_login_at = latest.logged_at
+FROM (
+    SELECT user_id, max(logged_at) AS logged_at
+    FROM unnest($1::uuid[], $2::timestamptz[]) AS batch(user_id, logged_at)
+    GROUP BY user_id
+) AS latest
+WHERE users.id = latest.user_id
+  AND (users.last_login_at IS NULL OR users.last_login_at < latest.logged_at)
+"""
+
+def is_permanent(error: BaseException) -> bool:
+    """Whether an error, or the driver error SQLAlchemy wrapped, is the database refusing the data."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return False
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, PERMANENT_ERRORS):
+            return True
+        seen.add(id(error))
+        error = getattr(error, "orig", None) or error.__cause__
+    return False
+
+def client_ip(request: Request) -> Optional[str]:
+    """Address of the client, as seen by the nginx in front of us when there is one."""
+    # nginx overwrites X-Real-IP (see deployment/nginx.conf), clients cannot set it
+    ip = request.headers.get("x-real-ip")
+    if ip:
+        return ip[:45]
+    return request.client.host if request.client else None
+
+class LoginEventWriter:
+    """
+    Login history written off the request path.
+    Logins only append to a bounded in-memory buffer; a background task writes
+    it with COPY, in one transaction per batch along with users.last_login_at,
+    once a batch is full or every flush interval. When the database falls
+    behind the buffer fills up and further events are dropped and counted,
+    rather than slowing logins down. Events the database refuses are counted
+    as rejected and skipped. Whatever is left is written on shutdown.
+    """
+
+    def __init__(
+        self,
+        capacity: int = LOGIN_EVENTS_BUFFER_SIZE,
+        batch_size: int = LOGIN_EVENTS_BATCH_SIZE,
+        flush_seconds: float = LOGIN_EVENTS_FLUSH_SECONDS
+    ):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._events = deque()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._dropped_reported = 0
+        self.last_flush_ms: Optional[float] = None
+        self.stats = Counter()
+
+    def record(self, user_id: uuid.UUID, provider: str, request: Optional[Request] = None):
+        """Buffer a successful login, without any I/O."""
+        if len(self._events) >= self.capacity:
+            self.stats["dropped"] += 1
+            return
+        user_agent = request.headers.get("user-agent") if request is not None else None
+        self._events.append((
+            user_id,
+            provider,
+            client_ip(request) if request is not None else None,
+            user_agent[:USER_AGENT_MAX_LENGTH] if user_agent else None,
+            utcnow()
+        ))
+        self.stats["recorded"] += 1
+        if len(self._events) >= self.batch_size:
+            self._batch_ready.set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="login history writer")
+
+    async def stop(self):
+        """Stop the background task and write what is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        if self._events:
+            self.stats["dropped"] += len(self._events)
+            logger.warning(f"{len(self._events)} login events lost on shutdown")
+            self._events.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write the buffered events, one batch at a time."""
+        async with self._flush_lock:
+            while self._events:
+                batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+                started = time.perf_counter()
+                try:
+                    await self._write(batch)
+                except asyncio.CancelledError:
+                    self._requeue(batch)
+                    raise
+                except Exception as e:
+                    if not is_permanent(e):
+                        logger.warning(f"Could not write {len(batch)} login events, retrying later: {e}")
+                        self.stats["failed_flushes"] += 1
+                        self._requeue(batch)
+                        break
+                    # Refused data (e.g. the user was deleted since the login): retrying the
+                    # batch would fail forever, so only the refused events are left out
+                    left = await self._write_each(batch, e)
+                    if left:
+                        self.stats["failed_flushes"] += 1
+                        self._requeue(left)
+                        break
+                    continue
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+                self.stats["written"] += len(batch)
+        self._report_drops()
+
+    async def _write_each(self, batch: list, batch_error: Exception) -> List[tuple]:
+        """
+        Write a refused batch one event at a time, skipping the events the
+        database refuses. Returns the events left if another error stops it.
+        """
+        rejected = 0
+        for index, event in enumerate(batch):
+            try:
+                await self._write([event])
+            except asyncio.CancelledError:
+                self.stats["rejected"] += rejected
+                self._requeue(batch[index:])
+                raise
+            except Exception as e:
+                if not is_permanent(e):
+                    self.stats["rejected"] += rejected
+                    return batch[index:]
+                rejected += 1
+            else:
+                self.stats["written"] += 1
+        self.stats["rejected"] += rejected
+        logger.warning(f"{rejected} of {len(batch)} login events rejected by the database: {batch_error}")
+        return []
+
+    def _requeue(self, batch: list):
+        # Retried on the next flush, ahead of the newer events
+        self._events.extendleft(reversed(batch))
+        while len(self._events) > self.capacity:
+            self._events.pop()
+            self.stats["dropped"] += 1
+
+    def _report_drops(self):
+        dropped = self.stats["dropped"] - self._dropped_reported
+        if dropped:
+            logger.warning(f"Login history buffer full, {dropped} events dropped")
+            self._dropped_reported = self.stats["dropped"]
+
+    async def _write(self, batch: list):
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            pg = raw.driver_connection
+            async with pg.transaction():
+                await pg.copy_records_to_table("login_events", records=batch, columns=COLUMNS)
+                await pg.execute(
+                    UPDATE_LAST_LOGIN,
+                    [event[0] for event in batch],
+                    [event[4] for event in batch]
+                )
+
+    def metrics(self) -> dict:
+        """Counters since startup, and what is waiting to be written."""
+        return {
+            "buffered": len(self._events),
+            "recorded": self.stats["recorded"],
+            "written": self.stats["written"],
+            "dropped": self.stats["dropped"],
+            "rejected": self.stats["rejected"],
+            "failed_flushes": self.stats["failed_flushes"],
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+login_events = LoginEventWriter()
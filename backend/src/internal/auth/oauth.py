@@ -1,6 +1,6 @@
 from authlib.integrations.base_client import OAuthError
 from authlib.integrations.httpx_client import AsyncOAuth2Client
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import httpx
 from datetime import datetime, timedelta
 
@@ -11,6 +11,35 @@ from internal.config.config import (
     STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET
 )
 
+# Shared connection pool so that provider calls reuse warm TLS connections
+PROVIDER_REQUEST_TIMEOUT = 15
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_provider_transport() -> httpx.AsyncHTTPTransport:
+    """Get the connection pool shared by all OAuth provider calls."""
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport()
+    return _transport
+
+def get_provider_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for OAuth provider APIs."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(transport=get_provider_transport(), timeout=PROVIDER_REQUEST_TIMEOUT)
+    return _http_client
+
+async def close_provider_client():
+    """Close the shared provider connections."""
+    global _transport, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
+
 class OAuthProvider:
     def __init__(self, client_id: str, client_secret: str, authorize_url: str, 
                  token_url: str, user_info_url: str, scopes: list):
@@ -41,7 +70,9 @@ class OAuthProvider:
         client = AsyncOAuth2Client(
             client_id=self.client_id,
             client_secret=self.client_secret,
-            redirect_uri=self.redirect_uri.format(provider=provider_name)
+            redirect_uri=self.redirect_uri.format(provider=provider_name),
+            transport=get_provider_transport(),
+            timeout=PROVIDER_REQUEST_TIMEOUT
         )
         
         try:
@@ -55,14 +86,17 @@ class OAuthProvider:
 
     async def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get user information from OAuth provider."""
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {access_token}"}
-            response = await client.get(self.user_info_url, headers=headers)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await get_provider_client().get(self.user_info_url, headers=headers)
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get user info: {response.text}")
             
-            if response.status_code != 200:
-                raise Exception(f"Failed to get user info: {response.text}")
-                
-            return response.json()
+        return response.json()
+
+    def origins(self) -> List[str]:
+        """Scheme and host of every endpoint called from the backend."""
+        return sorted({str(httpx.URL(url).copy_with(path="/", query=None)) for url in (self.token_url, self.user_info_url)})
 
 # OAuth provider configurations
 OAUTH_PROVIDERS = {
@@ -0,0 +1,72 @@
+import statistics
+import time
+from typing import Tuple
+
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+from internal.config.config import (
+    PASSWORD_HASH_SCHEME,
+    ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_MAX_MEMORY_COST,
+)
+
+# Smallest parameters calibration starts from (OWASP minimum for Argon2id)
+MIN_MEMORY_COST = 19456
+MIN_TIME_COST = 2
+# Verifications timed per candidate, the median is kept
+CALIBRATION_SAMPLES = 3
+
+def build_password_context(
+    time_cost: int = ARGON2_TIME_COST,
+    memory_cost: int = ARGON2_MEMORY_COST,
+    parallelism: int = ARGON2_PARALLELISM
+) -> CryptContext:
+    """
+    Build the password context.
+    New hashes use PASSWORD_HASH_SCHEME; hashes of the other scheme, or Argon2
+    hashes made with other parameters, are reported by needs_update().
+    """
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        default=PASSWORD_HASH_SCHEME,
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism
+    )
+
+def measure_argon2_verify(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    """Median time in milliseconds to verify a password with the given Argon2id parameters."""
+    handler = argon2.using(type="ID", time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = handler.hash("calibration-password")
+    samples = []
+    for _ in range(CALIBRATION_SAMPLES):
+        start = time.perf_counter()
+        handler.verify("calibration-password", hashed)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def calibrate_argon2(
+    target_ms: float,
+    parallelism: int = ARGON2_PARALLELISM,
+    max_memory_cost: int = ARGON2_MAX_MEMORY_COST
+) -> Tuple[int, int, float]:
+    """
+    Find Argon2id parameters whose verify time reaches target_ms on this machine.
+    Memory is doubled first (it is what makes Argon2 expensive to attack), then
+    the time cost grows once memory hits max_memory_cost.
+    Returns (time_cost, memory_cost, measured_ms).
+    """
+    time_cost, memory_cost = MIN_TIME_COST, MIN_MEMORY_COST
+    elapsed = measure_argon2_verify(time_cost, memory_cost, parallelism)
+    while elapsed < target_ms:
+        if memory_cost * 2 <= max_memory_cost:
+            memory_cost *= 2
+        else:
+            time_cost += 1
+        elapsed = measure_argon2_verify(time_cost, memory_cost, parallelism)
+    return time_cost, memory_cost, elapsed
@@ -0,0 +1,128 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Set
+
+import asyncpg
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from internal.auth.bloom import BloomFilter
+from internal.config.config import (
+    DATABASE_NAME,
+    DATABASE_USER,
+    DATABASE_PASSWORD,
+    DATABASE_HOST,
+    DATABASE_PORT,
+    REVOCATION_FILTER_CAPACITY,
+    REVOCATION_FILTER_ERROR_RATE,
+)
+from internal.database.database import AsyncSessionLocal
+from internal.database.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel carrying the jti of each new revocation to every worker
+REVOCATION_CHANNEL = "token_revocations"
+
+class RevocationList:
+    """
+    Per-worker view of the revoked access tokens.
+    A Bloom filter over the live revocations answers "not revoked" without any
+    I/O; only filter hits are confirmed against revoked_tokens. Workers learn
+    about new revocations through LISTEN/NOTIFY and rebuild the filter from a
+    snapshot on refresh(), which drops expired tokens and bounds its size.
+    """
+
+    def __init__(self, capacity: int = REVOCATION_FILTER_CAPACITY, error_rate: float = REVOCATION_FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # None until the first snapshot, every lookup goes to the database meanwhile
+        self._filter: Optional[BloomFilter] = None
+        # Revocations received while a snapshot is being built
+        self._pending: Optional[Set[str]] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self.stats = Counter()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the filter holds a snapshot (otherwise every check queries the database)."""
+        return self._filter is not None
+
+    def _remember(self, jti: str):
+        if self._filter is not None:
+            self._filter.add(jti)
+        if self._pending is not None:
+            self._pending.add(jti)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        self._remember(payload)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """Check whether a token id was revoked."""
+        if self._filter is not None and jti not in self._filter:
+            self.stats["filter_negative"] += 1
+            return False
+
+        self.stats["database_lookup"] += 1
+        async with AsyncSessionLocal() as db:
+            revoked = (await db.execute(select(RevokedToken.jti).where(RevokedToken.jti == jti))).first() is not None
+        if not revoked:
+            self.stats["false_positive"] += 1
+        return revoked
+
+    async def revoke(self, jti: str, user_id: Optional[str], expires_at: datetime):
+        """Revoke a token id until its expiry and tell the other workers."""
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(RevokedToken).values(
+                jti=jti,
+                user_id=user_id,
+                expires_at=expires_at
+            ).on_conflict_do_nothing(index_elements=[RevokedToken.jti]))
+            # Delivered to the listeners when the transaction commits
+            await db.execute(select(func.pg_notify(REVOCATION_CHANNEL, jti)))
+            await db.commit()
+        self._remember(jti)
+
+    async def _ensure_listener(self):
+        if self._listener is not None and not self._listener.is_closed():
+            return
+        if self._listener is not None:
+            logger.warning("Lost the token revocation listener, reconnecting")
+        self._listener = await asyncpg.connect(
+            host=DATABASE_HOST,
+            port=int(DATABASE_PORT),
+            user=DATABASE_USER,
+            password=DATABASE_PASSWORD,
+            database=DATABASE_NAME
+        )
+        await self._listener.add_listener(REVOCATION_CHANNEL, self._on_notification)
+
+    async def refresh(self):
+        """Rebuild the filter from the unexpired revocations and purge the expired ones."""
+        # Listen first, so that nothing revoked during the snapshot is missed
+        await self._ensure_listener()
+        self._pending = set()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= func.now()))
+                await db.commit()
+                jtis = (await db.execute(select(RevokedToken.jti))).scalars().all()
+
+            # Hashing a large snapshot would stall the event loop
+            bloom = await run_in_threadpool(
+                BloomFilter.for_capacity, max(self.capacity, 2 * len(jtis)), self.error_rate, jtis
+            )
+            for jti in self._pending:
+                bloom.add(jti)
+            self._filter = bloom
+        finally:
+            self._pending = None
+
+    async def close(self):
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+revocations = RevocationList()
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 import uuid
 
+from internal.config.config import GRAPH_BATCH_MAX_GROUPS, USER_RESOLVE_MAX_KEYS
+
 # User schemas
 class UserBase(BaseModel):
     email: EmailStr
@@ -22,6 +24,22 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+class UserResolveRequest(BaseModel):
+    # User ids or emails, in any mix
+    keys: List[str] = Field(..., min_length=1, max_length=USER_RESOLVE_MAX_KEYS)
+
+class UserResolution(BaseModel):
+    key: str
+    status: Literal["found", "not_found", "invalid"]
+    user: Optional[UserResponse] = None
+
+class UserResolveResponse(BaseModel):
+    results: List[UserResolution]
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -43,3 +61,8 @@ class OAuthCallback(BaseModel):
 class OAuthURL(BaseModel):
     auth_url: str
     state: str
+
+# Microsoft Graph schemas
+class GroupMembersBatchRequest(BaseModel):
+    # Graph object ids are GUIDs, which also keeps them safe to put in sub-request URLs
+    group_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=GRAPH_BATCH_MAX_GROUPS)
@@ -1,72 +1,108 @@
-from datetime import datetime, timedelta
-from typing import Optional, Union
+from datetime import timedelta
+from typing import NamedTuple, Optional, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 import uuid
 
-from internal.database.database import get_db
-from internal.database.models import User, UserSession
+from internal.database.database import on_replica, read_session
+from internal.database.models import utcnow, USER_COLUMNS, User, UserPassword, UserSession
+from internal.auth.keys import ASYMMETRIC_ALGORITHMS, SigningKeyRing
+from internal.auth.password_hashing import build_password_context
+from internal.auth.revocation import revocations
+from internal.telemetry.tracing import tracer
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_password_context()
 
 # JWT settings
-from internal.config.config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+from internal.config.config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_ACCESS_TOKEN_EXPIRE_MINUTES, ADMIN_EMAILS, READ_YOUR_WRITES_SECONDS
 
 SECRET_KEY = JWT_SECRET_KEY
 ALGORITHM = JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+SESSION_EXPIRE_DAYS = 7
+
+if ALGORITHM not in ASYMMETRIC_ALGORITHMS and not ALGORITHM.startswith("HS"):
+    raise ValueError(f"Unsupported JWT algorithm: {ALGORITHM}")
+
+# Asymmetric keys, None when signing with the shared secret
+key_ring = SigningKeyRing() if ALGORITHM in ASYMMETRIC_ALGORITHMS else None
 
 # Security scheme
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with tracer.start_as_current_span("auth.verify_password") as span:
+        span.set_attribute("auth.hash_scheme", pwd_context.identify(hashed_password) or "unknown")
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if a hash uses an outdated scheme or cost and should be replaced."""
+    return pwd_context.needs_update(hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
+    with tracer.start_as_current_span("auth.create_access_token") as span:
+        span.set_attribute("auth.jwt_algorithm", ALGORITHM)
+        return _encode_access_token(data, expires_delta)
+
+def _encode_access_token(data: dict, expires_delta: Optional[timedelta]) -> str:
     to_encode = data.copy()
+    now = utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    # jti identifies the token for revocation
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
+    if key_ring is None:
+        return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+    signing_key = key_ring.signing_key()
+    return jwt.encode(
+        to_encode,
+        signing_key.private_pem,
+        algorithm=ALGORITHM,
+        headers={"kid": signing_key.kid}
+    )
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if key_ring is None:
+            key = SECRET_KEY
+        else:
+            key = key_ring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+        payload = jwt.decode(token, key, algorithms=[ALGORITHM])
         return payload
     except JWTError:
         return None
 
+def get_jwks() -> dict:
+    """Get the public keys that verify our tokens."""
+    if key_ring is None:
+        return {"keys": []}
+    return key_ring.jwks()
+
 async def create_session_token(user_id: uuid.UUID, db: AsyncSession) -> str:
     """Create a new session token for a user."""
-    # Clean up expired sessions
-    stmt = select(UserSession).where(
-        UserSession.user_id == user_id,
-        UserSession.expires_at < datetime.utcnow()
-    )
-    result = await db.execute(stmt)
-    expired_sessions = result.scalars().all()
-    for session in expired_sessions:
-        await db.delete(session)
+    # Expired sessions are not deleted here: user_sessions is partitioned on
+    # expires_at and whole expired partitions are dropped by the maintenance job
     
     # Create new session
     session_token = str(uuid.uuid4())
-    expires_at = datetime.utcnow() + timedelta(days=7)  # Session lasts 7 days
+    expires_at = utcnow() + timedelta(days=SESSION_EXPIRE_DAYS)
     
     session = UserSession(
         id=uuid.uuid4(),
@@ -79,42 +115,81 @@ async def create_session_token(user_id: uuid.UUID, db: AsyncSession) -> str:
     
     return session_token
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+async def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """Get the claims of a valid JWT token, without touching the database."""
     try:
         token = credentials.credentials
         payload = verify_token(token)
-        if payload is None:
-            raise credentials_exception
-        
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-            
+        if payload is None or payload.get("sub") is None:
+            raise credentials_exception()
     except Exception:
-        raise credentials_exception
+        raise credentials_exception()
     
-    # Get user from database
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
-    
-    if user is None:
-        raise credentials_exception
+    # Only tokens whose id hits the revocation filter cost a query
+    jti = payload.get("jti")
+    if jti is not None and await revocations.is_revoked(jti):
+        raise credentials_exception()
+    return payload
+
+async def fetch_token_user(payload: dict, stmt):
+    """
+    Run a select on the token's user, preferably on a read replica.
+    Returns the first row, or None if the user does not exist.
+    """
+    user_id = payload["sub"]
+    # Tokens are issued right after the writes of login and sign-up,
+    # a fresh token must not read a replica that has not replayed them yet
+    fresh = utcnow().timestamp() - payload.get("iat", 0) < READ_YOUR_WRITES_SECONDS
     
-    return user
+    async with read_session(sticky_key=user_id, use_primary=fresh) as db:
+        row = (await db.execute(stmt)).first()
+        replica_miss = row is None and on_replica(db)
+    if replica_miss:
+        async with read_session(use_primary=True) as db:
+            row = (await db.execute(stmt)).first()
+    return row
+
+class AuthUser(NamedTuple):
+    """What authorization needs to know about the token's user."""
+    id: uuid.UUID
+    email: str
+    is_active: bool
+
+AUTH_USER_COLUMNS = (User.id, User.email, User.is_active)
+
+def login_query(email: str):
+    """Select a user's response columns and password hash by email, no row without a password."""
+    return (
+        select(*USER_COLUMNS, UserPassword.id.label("password_id"), UserPassword.password_hash)
+        .join(UserPassword, UserPassword.user_id == User.id)
+        .where(User.email == email)
+    )
+
+async def get_current_user(payload: dict = Depends(get_token_payload)) -> AuthUser:
+    """Get current authenticated user from JWT token."""
+    # Plain columns: no entity to build, track in an identity map or expire
+    row = await fetch_token_user(payload, select(*AUTH_USER_COLUMNS).where(User.id == payload["sub"]))
+    if row is None:
+        raise credentials_exception()
+    return AuthUser(*row)
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: AuthUser = Depends(get_current_user)) -> AuthUser:
     """Get current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+async def get_current_admin_user(current_user: AuthUser = Depends(get_current_active_user)) -> AuthUser:
+    """Get current active user, who must be an administrator."""
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Administrator access required")
+    return current_user
@@ -20,6 +20,31 @@ def check_env_variable(key: str) -> str:
 BACKEND_API_HOST = check_env_variable("BACKEND_API_HOST")
 BACKEND_API_PORT = check_env_variable("BACKEND_API_PORT")
 BACKEND_API_DEFAULT_ROUTE = check_env_variable("BACKEND_API_DEFAULT_ROUTE")
+# Responses larger than this (bytes) are gzip-compressed when the client accepts it
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+
+# Startup warmup and readiness
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))  # Connections opened per engine before reporting ready
+WARMUP_PROVIDERS = os.getenv("WARMUP_PROVIDERS", "true")  # "true" to pre-connect to the enabled OAuth providers
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+# Load shedding: past these thresholds low priority routes get 503, normal ones past twice them
+LOAD_SHED_LAG_MS = float(os.getenv("LOAD_SHED_LAG_MS", "200"))  # Event loop lag, 0 disables the check
+LOAD_SHED_MAX_IN_FLIGHT = int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "100"))  # Requests being handled, 0 disables the check
+LOAD_SHED_RETRY_AFTER_SECONDS = int(os.getenv("LOAD_SHED_RETRY_AFTER_SECONDS", "2"))
+# Route priorities ("path prefix=high|normal|low,...", relative to BACKEND_API_DEFAULT_ROUTE); high is never shed
+LOAD_SHED_PRIORITIES = {
+    prefix.strip(): priority.strip()
+    for prefix, priority in (
+        item.split("=", 1)
+        for item in os.getenv(
+            "LOAD_SHED_PRIORITIES",
+            "/health=high,/auth/standard/me=high,/auth/logout=high,/auth/verify=high,/.well-known=high,"
+            "/auth/standard/register=low,/auth/microsoft/groups=low,/data=low"
+        ).split(",")
+        if "=" in item
+    )
+}
 
 ### AUTHENTICATION CONFIGURATION ###
 # Authentication methods
@@ -36,6 +61,15 @@ ENTRA_ID_BASE_URL = "https://login.microsoftonline.com/"
 ENTRA_ID_USER_SCOPE = "User.Read,Group.Read.All,GroupMember.Read.All"
 ENTRA_ID_APPLICATION_SCOPE = "https://graph.microsoft.com/.default"
 
+# Microsoft Graph
+GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
+GRAPH_PAGE_SIZE = int(os.getenv("GRAPH_PAGE_SIZE", "100"))  # Default $top, Graph caps it at 999
+GRAPH_MAX_RETRIES = int(os.getenv("GRAPH_MAX_RETRIES", "3"))  # Retries on 429/503/504
+GRAPH_REQUEST_TIMEOUT = float(os.getenv("GRAPH_REQUEST_TIMEOUT", "30"))
+GRAPH_BATCH_CONCURRENCY = int(os.getenv("GRAPH_BATCH_CONCURRENCY", "4"))  # Concurrent $batch requests
+GRAPH_BATCH_MAX_GROUPS = int(os.getenv("GRAPH_BATCH_MAX_GROUPS", "500"))  # Group ids accepted per bulk call
+GRAPH_GROUP_SYNC_INTERVAL_SECONDS = int(os.getenv("GRAPH_GROUP_SYNC_INTERVAL_SECONDS", "0"))  # 0 disables the sync job
+
 # Google authentication
 GOOGLE_CLIENT_ID = check_env_variable("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = check_env_variable("GOOGLE_CLIENT_SECRET")
@@ -49,13 +83,89 @@ STRAVA_CLIENT_ID = check_env_variable("STRAVA_CLIENT_ID")
 STRAVA_CLIENT_SECRET = check_env_variable("STRAVA_CLIENT_SECRET")
 
 # JWT Configuration
-JWT_SECRET_KEY = check_env_variable("JWT_SECRET_KEY")
-JWT_ALGORITHM = "HS256"
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")  # HS256 with a shared secret, or RS256/ES256 with a key ring
+JWT_SECRET_KEY = check_env_variable("JWT_SECRET_KEY") if JWT_ALGORITHM.startswith("HS") else os.getenv("JWT_SECRET_KEY")
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Asymmetric signing keys (one <kid>.pem private key per file)
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "keys")
+JWT_KEYS_RELOAD_SECONDS = int(os.getenv("JWT_KEYS_RELOAD_SECONDS", "60"))
+JWKS_CACHE_MAX_AGE_SECONDS = int(os.getenv("JWKS_CACHE_MAX_AGE_SECONDS", "300"))
+# A new key is published this long before it signs, so verifier caches pick it up first
+JWT_KEY_ACTIVATION_DELAY_SECONDS = int(os.getenv("JWT_KEY_ACTIVATION_DELAY_SECONDS", str(JWKS_CACHE_MAX_AGE_SECONDS)))
+
+# Seconds a gateway may cache a successful /auth/verify (bounded by the token expiry)
+AUTH_VERIFY_CACHE_SECONDS = int(os.getenv("AUTH_VERIFY_CACHE_SECONDS", "10"))
+
+# Access token revocation (per-worker Bloom filter over the revoked_tokens denylist)
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))  # Grows with the live revocations
+REVOCATION_FILTER_ERROR_RATE = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.001"))  # Share of lookups hitting the database
+REVOCATION_REFRESH_SECONDS = int(os.getenv("REVOCATION_REFRESH_SECONDS", "60"))  # Snapshot rebuild and purge of expired rows
+
+# Administrators (comma-separated emails) allowed on the admin data endpoints
+ADMIN_EMAILS = [email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()]
+
+# Password hashing (pin the values printed by tools/calibrate_password_hash.py: workers
+# hashing with different parameters would rehash passwords on every login)
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "argon2")  # Scheme of new hashes: argon2 (Argon2id) or bcrypt
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+ARGON2_MAX_MEMORY_COST = int(os.getenv("ARGON2_MAX_MEMORY_COST", "262144"))  # KiB, upper bound for calibration
+PASSWORD_HASH_TARGET_MS = int(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))  # Target verify latency of tools/calibrate_password_hash.py
+
+# Breached password filter compiled by tools/breached_passwords.py, rejected at sign-up
+BREACHED_PASSWORDS_FILE = os.getenv("BREACHED_PASSWORDS_FILE", "")  # Empty disables the check
+BREACHED_PASSWORDS_RELOAD_SECONDS = int(os.getenv("BREACHED_PASSWORDS_RELOAD_SECONDS", "60"))  # Replaced files are picked up, 0 disables reloading
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json (one object per line) or text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records waiting for the writer thread, extra ones are dropped
+# Share of the records below WARNING kept for chatty loggers ("logger=ratio,...")
+LOG_SAMPLE_RATES = {
+    name.strip(): float(ratio)
+    for name, ratio in (
+        item.split("=", 1)
+        for item in os.getenv("LOG_SAMPLE_RATES", "sqlalchemy.engine=0.1,httpx=0.1").split(",")
+        if "=" in item
+    )
+}
+
+# Blocking-call detector (diagnostics, adds a sidecar thread)
+BLOCKING_DETECTOR = os.getenv("BLOCKING_DETECTOR", "false")  # "true" to report event loop stalls at /debug/blocking
+BLOCKING_THRESHOLD_MS = float(os.getenv("BLOCKING_THRESHOLD_MS", "100"))  # Stalls longer than this are recorded
+BLOCKING_REPORT_FILE = os.getenv("BLOCKING_REPORT_FILE", "")  # Also append each stall as a JSON line to this file
+
+# Tracing (OpenTelemetry)
+OTEL_TRACING = os.getenv("OTEL_TRACING", "false")  # "true" to trace requests, SQL, outgoing HTTP and crypto
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "auth-backend")
+OTEL_TRACES_SAMPLER_RATIO = float(os.getenv("OTEL_TRACES_SAMPLER_RATIO", "1.0"))  # Share of new traces recorded
+OTEL_TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "file")  # otlp (OTEL_EXPORTER_OTLP_ENDPOINT), file or console
+OTEL_TRACES_FILE = os.getenv("OTEL_TRACES_FILE", "traces.jsonl")  # One JSON span per line with the file exporter
+
 ### DATA CONFIGURATION ###
 DATABASE_NAME = check_env_variable("DATABASE_NAME")
 DATABASE_USER = check_env_variable("DATABASE_USER")
 DATABASE_PASSWORD = check_env_variable("DATABASE_PASSWORD")
 DATABASE_HOST = check_env_variable("DATABASE_HOST")
 DATABASE_PORT = check_env_variable("DATABASE_PORT")
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false")  # "true" to log every SQL statement (sampled, see LOG_SAMPLE_RATES)
+DATA_EXPORT_BATCH_SIZE = int(os.getenv("DATA_EXPORT_BATCH_SIZE", "1000"))  # Rows fetched per server-side cursor round trip
+USER_RESOLVE_MAX_KEYS = int(os.getenv("USER_RESOLVE_MAX_KEYS", "500"))  # User ids or emails per batch resolve request
+
+# Login history (buffered in each worker, written in batches through COPY)
+LOGIN_EVENTS_BUFFER_SIZE = int(os.getenv("LOGIN_EVENTS_BUFFER_SIZE", "10000"))  # Past this, new events are dropped (and counted)
+LOGIN_EVENTS_BATCH_SIZE = int(os.getenv("LOGIN_EVENTS_BATCH_SIZE", "500"))  # A flush starts as soon as this many are buffered
+LOGIN_EVENTS_FLUSH_SECONDS = float(os.getenv("LOGIN_EVENTS_FLUSH_SECONDS", "2"))  # ...or this long after the previous one
+
+# Read replicas (comma-separated host:port, same credentials and database as the primary)
+DATABASE_REPLICA_HOSTS = [host.strip() for host in os.getenv("DATABASE_REPLICA_HOSTS", "").split(",") if host.strip()]
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5"))  # Lagging replicas are skipped
+DATABASE_REPLICA_CHECK_SECONDS = int(os.getenv("DATABASE_REPLICA_CHECK_SECONDS", "5"))
+# Reads of a user go to the primary this long after a write or a token issued to them
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+# user_sessions partitions (one per day of expires_at)
+SESSION_PARTITION_DAYS_AHEAD = int(os.getenv("SESSION_PARTITION_DAYS_AHEAD", "14"))
+SESSION_PARTITION_MAINTENANCE_SECONDS = int(os.getenv("SESSION_PARTITION_MAINTENANCE_SECONDS", "3600"))  # 0 disables the job, new sessions then pile up in user_sessions_default
@@ -1,13 +1,31 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 import asyncpg
-from internal.config.config import DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST, DATABASE_PORT
+from internal.config.config import (
+    DATABASE_NAME,
+    DATABASE_USER,
+    DATABASE_PASSWORD,
+    DATABASE_HOST,
+    DATABASE_PORT,
+    DATABASE_REPLICA_HOSTS,
+    DATABASE_REPLICA_MAX_LAG_SECONDS,
+    READ_YOUR_WRITES_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
 
 # Database URL for async connection
 DATABASE_URL = f"postgresql+asyncpg://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
 
-# Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Create async engine (SQL logging goes through the logging setup, see DATABASE_ECHO)
+engine = create_async_engine(DATABASE_URL)
 
 # Create async session maker
 AsyncSessionLocal = async_sessionmaker(
@@ -21,3 +39,121 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+# Replication lag, zero when the replica replayed everything it received
+# (the last replay timestamp alone grows on an idle primary). That shortcut
+# only holds while WAL is streaming in: a replica whose receiver stopped has
+# replayed all it got and still falls behind, so its lag is measured from the
+# last replay. The status needs pg_read_all_stats (NULL otherwise, which
+# falls back to the replay timestamp as well).
+REPLICA_LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+         AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+""")
+
+class Replica:
+    """A read replica engine and its last known health."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.engine: AsyncEngine = create_async_engine(
+            f"postgresql+asyncpg://{DATABASE_USER}:{DATABASE_PASSWORD}@{host}/{DATABASE_NAME}",
+            pool_pre_ping=True
+        )
+        # Unhealthy until the first check succeeds
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+
+class ReplicaSet:
+    """
+    Round-robin over the read replicas that are up and within the lag budget.
+    Health is refreshed by check(), run periodically; reads fall back to the
+    primary when no replica qualifies.
+    """
+
+    def __init__(self, hosts: List[str], max_lag_seconds: float = DATABASE_REPLICA_MAX_LAG_SECONDS):
+        self.replicas = [Replica(host) for host in hosts]
+        self.max_lag_seconds = max_lag_seconds
+        self._counter = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """Engine of the next healthy replica, None if there is none."""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)].engine
+
+    async def check(self):
+        """Measure the lag of every replica and update its health."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning(f"Read replica {replica.host} is unreachable: {e}")
+                replica.healthy, replica.lag_seconds = False, None
+                continue
+
+            # A promoted replica (not in recovery) is no longer a replica of this primary
+            healthy = lag is not None and float(lag) <= self.max_lag_seconds
+            if healthy != replica.healthy:
+                logger.warning(f"Read replica {replica.host} is now {'healthy' if healthy else 'out of rotation'} (lag: {lag})")
+            replica.healthy = healthy
+            replica.lag_seconds = None if lag is None else float(lag)
+
+    def status(self) -> List[dict]:
+        return [
+            {"host": replica.host, "healthy": replica.healthy, "lag_seconds": replica.lag_seconds}
+            for replica in self.replicas
+        ]
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+replicas = ReplicaSet(DATABASE_REPLICA_HOSTS)
+
+# Per-process record of recent writes, key -> monotonic deadline of the sticky window
+_recent_writes: Dict[str, float] = {}
+_RECENT_WRITES_PRUNE_SIZE = 10000
+
+def mark_write(key) -> None:
+    """Send the reads of `key` (usually a user id) to the primary for a short while."""
+    now = time.monotonic()
+    if len(_recent_writes) >= _RECENT_WRITES_PRUNE_SIZE:
+        for stale in [k for k, deadline in _recent_writes.items() if deadline <= now]:
+            del _recent_writes[stale]
+    _recent_writes[str(key)] = now + READ_YOUR_WRITES_SECONDS
+
+def wrote_recently(key) -> bool:
+    deadline = _recent_writes.get(str(key))
+    return deadline is not None and deadline > time.monotonic()
+
+@asynccontextmanager
+async def read_session(sticky_key=None, use_primary: bool = False):
+    """
+    Session for read-only queries, on a replica when one is healthy.
+    Reads tied to a recent write of `sticky_key` stay on the primary.
+    """
+    bind = None
+    if not use_primary and not (sticky_key is not None and wrote_recently(sticky_key)):
+        bind = replicas.pick()
+    async with AsyncSession(bind or engine, expire_on_commit=False) as session:
+        yield session
+
+def on_replica(session: AsyncSession) -> bool:
+    return session.bind is not engine
+
+# Dependency to get a read-only database session
+async def get_read_db():
+    async with read_session() as session:
+        yield session
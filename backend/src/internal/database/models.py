@@ -1,8 +1,8 @@
-from sqlalchemy import create_engine, Column, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, Column, String, Boolean, DateTime, Text, ForeignKey, Index, UniqueConstraint, func, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 import os
 
@@ -17,64 +17,165 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime, matching TIMESTAMP WITH TIME ZONE columns."""
+    return datetime.now(timezone.utc)
+
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("uuid_generate_v4()"))
+    email = Column(String(255), unique=True, nullable=False)
     username = Column(String(100))
     full_name = Column(String(255))
     avatar_url = Column(Text)
-    is_active = Column(Boolean, default=True)
-    is_verified = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_active = Column(Boolean, default=True, server_default=text("true"))
+    is_verified = Column(Boolean, default=False, server_default=text("false"))
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())  # Keyset pagination key
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
+    last_login_at = Column(DateTime(timezone=True))  # Set by the login history writer, leaves updated_at alone
     
-    # Relationships
-    passwords = relationship("UserPassword", back_populates="user", cascade="all, delete-orphan")
-    oauth_accounts = relationship("OAuthAccount", back_populates="user", cascade="all, delete-orphan")
-    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (the foreign keys cascade deletes, the collections are never loaded for it)
+    passwords = relationship("UserPassword", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    oauth_accounts = relationship("OAuthAccount", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # Keyset pagination order of the admin user listing
+        Index("idx_users_created_at_id", "created_at", "id"),
+    )
+
+# Columns of UserResponse, for reads that do not need a tracked entity
+USER_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.avatar_url,
+    User.is_active,
+    User.is_verified,
+    User.created_at,
+)
 
 class UserPassword(Base):
     __tablename__ = "user_passwords"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("uuid_generate_v4()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     password_hash = Column(String(255), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="passwords")
+    
+    __table_args__ = (
+        Index("idx_user_passwords_user_id", "user_id"),
+    )
 
 class OAuthAccount(Base):
     __tablename__ = "oauth_accounts"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("uuid_generate_v4()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     provider = Column(String(50), nullable=False)  # 'microsoft', 'google', 'facebook', 'strava'
     provider_user_id = Column(String(255), nullable=False)
     provider_email = Column(String(255))
     access_token = Column(Text)
     refresh_token = Column(Text)
-    expires_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="oauth_accounts")
+    
+    __table_args__ = (
+        UniqueConstraint("provider", "provider_user_id"),
+        Index("idx_oauth_accounts_user_id", "user_id"),
+    )
 
 class UserSession(Base):
     __tablename__ = "user_sessions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Range-partitioned on expires_at (see internal/database/partitions.py), so the
+    # partition key is part of the primary key and of the token's unique constraint:
+    # only (session_token, expires_at) is unique, tokens are random UUIDs
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("uuid_generate_v4()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
-    session_token = Column(String(255), unique=True, nullable=False, index=True)
-    expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    session_token = Column(String(255), nullable=False)
+    expires_at = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="sessions")
+    
+    __table_args__ = (
+        UniqueConstraint("session_token", "expires_at"),
+        Index("idx_user_sessions_user_id", "user_id"),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
+    )
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    jti = Column(String(64), primary_key=True)  # JWT id of the revoked access token
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Row can go once the token expired
+    revoked_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    
+    __table_args__ = (
+        Index("idx_revoked_tokens_expires_at", "expires_at"),
+    )
+
+class LoginEvent(Base):
+    __tablename__ = "login_events"
+    
+    # Written in batches by internal/auth/login_events.py
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("uuid_generate_v4()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    provider = Column(String(50), nullable=False)  # 'password', 'microsoft', 'google', 'facebook', 'strava'
+    ip_address = Column(String(45))
+    user_agent = Column(String(512))
+    logged_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        # Login history of a user, latest first
+        Index("idx_login_events_user_id_logged_at", "user_id", "logged_at"),
+    )
+
+class GraphGroup(Base):
+    __tablename__ = "graph_groups"
+    
+    id = Column(String(64), primary_key=True)  # Microsoft Graph object id
+    display_name = Column(String(255))
+    description = Column(Text)
+    synced_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
+    
+    # Relationships
+    members = relationship("GraphGroupMember", back_populates="group", cascade="all, delete-orphan", passive_deletes=True)
+
+class GraphGroupMember(Base):
+    __tablename__ = "graph_group_members"
+    
+    group_id = Column(String(64), ForeignKey("graph_groups.id", ondelete="CASCADE"), primary_key=True)
+    member_id = Column(String(64), primary_key=True)
+    member_type = Column(String(100))  # e.g. '#microsoft.graph.user'
+    display_name = Column(String(255))
+    mail = Column(String(255))
+    user_principal_name = Column(String(255))
+    synced_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
+    
+    # Relationships
+    group = relationship("GraphGroup", back_populates="members")
+
+class GraphSyncState(Base):
+    __tablename__ = "graph_sync_state"
+    
+    name = Column(String(100), primary_key=True)  # e.g. 'group_memberships'
+    delta_link = Column(Text)
+    last_synced_at = Column(DateTime(timezone=True))
+    last_full_sync_at = Column(DateTime(timezone=True))
 
 # Dependency to get database session
 def get_db():
@@ -0,0 +1,122 @@
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from internal.config.config import SESSION_PARTITION_DAYS_AHEAD
+from internal.database.database import engine
+from internal.database.models import utcnow
+
+logger = logging.getLogger(__name__)
+
+# user_sessions is range-partitioned on expires_at, one partition per UTC day.
+# Expired sessions go away by dropping whole partitions instead of a mass DELETE.
+PARENT_TABLE = "user_sessions"
+PARTITION_PREFIX = "user_sessions_p"
+# Catches sessions no daily partition covers yet (maintenance disabled or failing),
+# so logins keep working. The job moves them out once their day's partition exists.
+DEFAULT_PARTITION = "user_sessions_default"
+# Advisory lock key so that only one worker runs the maintenance at a time
+PARTITION_MAINTENANCE_LOCK_ID = 0x73657373
+
+LIST_PARTITIONS = text("""
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = :parent
+""")
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+def partition_day(name: str) -> Optional[date]:
+    """Day covered by a partition, None if the name does not follow the convention."""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+def create_partition_sql(day: date) -> str:
+    """DDL creating the partition holding sessions expiring during `day` (UTC)."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+    )
+
+def create_default_partition_sql() -> str:
+    return f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+
+async def create_partition(day: date) -> int:
+    """
+    Create the partition of `day`, moving into it the sessions of that day the
+    default partition holds (Postgres refuses the partition otherwise).
+    Returns how many sessions were moved.
+    """
+    bounds = {
+        "start": datetime.combine(day, time.min, timezone.utc),
+        "end": datetime.combine(day + timedelta(days=1), time.min, timezone.utc)
+    }
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE TEMP TABLE user_sessions_moved (LIKE {PARENT_TABLE}) ON COMMIT DROP"))
+        moved = (await conn.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION} WHERE expires_at >= :start AND expires_at < :end RETURNING *
+            )
+            INSERT INTO user_sessions_moved SELECT * FROM moved
+        """), bounds)).rowcount
+        await conn.execute(text(create_partition_sql(day)))
+        if moved:
+            await conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM user_sessions_moved"))
+    return moved
+
+async def maintain_session_partitions(days_ahead: int = SESSION_PARTITION_DAYS_AHEAD) -> dict:
+    """Create the partitions of the coming days and drop the ones whose sessions all expired."""
+    today = utcnow().date()
+    created, dropped = [], []
+    moved = purged = default_rows = 0
+
+    # Each statement commits on its own, so no lock outlives its statement
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        locked = (await conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": PARTITION_MAINTENANCE_LOCK_ID})).scalar()
+        if not locked:
+            return {"created": created, "dropped": dropped, "moved": moved, "purged": purged, "default_rows": default_rows}
+        try:
+            existing = {row.relname for row in await conn.execute(LIST_PARTITIONS, {"parent": PARENT_TABLE})}
+
+            for offset in range(days_ahead + 1):
+                day = today + timedelta(days=offset)
+                if partition_name(day) not in existing:
+                    moved += await create_partition(day)
+                    created.append(partition_name(day))
+
+            for name in sorted(existing):
+                day = partition_day(name)
+                # Every session of the partition expired once its day is over
+                if day is not None and day + timedelta(days=1) <= today:
+                    # DETACH ... CONCURRENTLY is not allowed alongside a default partition:
+                    # the drop briefly holds an ACCESS EXCLUSIVE lock on user_sessions
+                    await conn.execute(text(f"DROP TABLE {name}"))
+                    dropped.append(name)
+
+            if DEFAULT_PARTITION in existing:
+                purged = (await conn.execute(
+                    text(f"DELETE FROM {DEFAULT_PARTITION} WHERE expires_at < :today"),
+                    {"today": datetime.combine(today, time.min, timezone.utc)}
+                )).rowcount
+                default_rows = (await conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}"))).scalar()
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": PARTITION_MAINTENANCE_LOCK_ID})
+
+    if created or dropped:
+        logger.info(f"Session partitions created: {created}, dropped: {dropped}")
+    if moved or purged:
+        logger.warning(f"{moved} sessions moved out of {DEFAULT_PARTITION}, {purged} expired ones deleted from it")
+    if default_rows:
+        # Sessions expiring past the partitions created ahead, e.g. a longer session lifetime
+        logger.warning(f"{default_rows} sessions in {DEFAULT_PARTITION}, beyond the daily partitions")
+    return {"created": created, "dropped": dropped, "moved": moved, "purged": purged, "default_rows": default_rows}
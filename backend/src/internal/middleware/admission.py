@@ -0,0 +1,143 @@
+import asyncio
+from collections import Counter
+from typing import Dict, Optional
+
+import orjson
+
+from internal.config.config import (
+    BACKEND_API_DEFAULT_ROUTE,
+    LOAD_SHED_LAG_MS,
+    LOAD_SHED_MAX_IN_FLIGHT,
+    LOAD_SHED_PRIORITIES,
+    LOAD_SHED_RETRY_AFTER_SECONDS,
+)
+
+PRIORITIES = ("high", "normal", "low")
+# Multiplier of the thresholds at which each priority starts being shed (None: never)
+SHED_FACTORS = {"high": None, "normal": 2.0, "low": 1.0}
+
+class LoopLagMonitor:
+    """
+    Measure how late the event loop wakes up a sleeping task.
+    The reported lag decays instead of dropping at once, so a single long
+    stall keeps shedding load for a few intervals while the backlog drains.
+    """
+
+    def __init__(self, interval_seconds: float = 0.05, decay: float = 0.8):
+        self.interval_seconds = interval_seconds
+        self.decay = decay
+        self.lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event loop lag monitor")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            sample = max(loop.time() - started - self.interval_seconds, 0.0) * 1000
+            self.lag_ms = max(sample, self.lag_ms * self.decay)
+
+loop_lag = LoopLagMonitor()
+
+# Middleware instance of the app, for admission_stats()
+_admission = None
+
+def admission_stats() -> dict:
+    """Current loop lag, requests in flight and requests shed per priority."""
+    if _admission is None:
+        return {"loop_lag_ms": round(loop_lag.lag_ms, 1), "in_flight": 0, "shed": {}}
+    return _admission.stats()
+
+class AdmissionMiddleware:
+    """
+    Reject requests with 503 and Retry-After while the worker is overloaded,
+    lowest priority routes first, instead of queueing them until they time out.
+    """
+
+    def __init__(
+        self,
+        app,
+        monitor: LoopLagMonitor = loop_lag,
+        lag_ms: float = LOAD_SHED_LAG_MS,
+        max_in_flight: int = LOAD_SHED_MAX_IN_FLIGHT,
+        priorities: Dict[str, str] = LOAD_SHED_PRIORITIES,
+        retry_after_seconds: int = LOAD_SHED_RETRY_AFTER_SECONDS,
+        root_path: Optional[str] = BACKEND_API_DEFAULT_ROUTE,
+    ):
+        self.app = app
+        self.monitor = monitor
+        self.lag_ms = lag_ms
+        self.max_in_flight = max_in_flight
+        self.retry_after_seconds = retry_after_seconds
+        root_path = (root_path or "").rstrip("/")
+        for priority in priorities.values():
+            if priority not in PRIORITIES:
+                raise ValueError(f"Unsupported load shedding priority: {priority}")
+        # Longest prefix first
+        self.priorities = sorted(
+            ((root_path + prefix, priority) for prefix, priority in priorities.items()),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.in_flight = 0
+        self.shed = Counter()
+        global _admission
+        _admission = self
+
+    def priority(self, path: str) -> str:
+        for prefix, priority in self.priorities:
+            if path.startswith(prefix):
+                return priority
+        return "normal"
+
+    def overloaded(self, priority: str) -> bool:
+        factor = SHED_FACTORS[priority]
+        if factor is None:
+            return False
+        if self.lag_ms > 0 and self.monitor.lag_ms > self.lag_ms * factor:
+            return True
+        return self.max_in_flight > 0 and self.in_flight >= self.max_in_flight * factor
+
+    def stats(self) -> dict:
+        return {"loop_lag_ms": round(self.monitor.lag_ms, 1), "in_flight": self.in_flight, "shed": dict(self.shed)}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.priority(scope["path"])
+        if self.overloaded(priority):
+            self.shed[priority] += 1
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(self.retry_after_seconds).encode()),
+                ],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": orjson.dumps({"detail": "Server overloaded, retry later"}),
+            })
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
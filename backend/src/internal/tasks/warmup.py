@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from internal.auth.oauth import get_provider_client
+from internal.auth.security import AUTH_USER_COLUMNS, login_query, pwd_context
+from internal.config.config import HEALTH_CHECK_TIMEOUT_SECONDS, WARMUP_DB_CONNECTIONS
+from internal.database import database, models
+from internal.database.models import USER_COLUMNS, OAuthAccount, RevokedToken, User
+
+logger = logging.getLogger(__name__)
+
+# Never matches, only there to bind parameters of the right type
+_NO_ID = uuid.UUID(int=0)
+
+# Statements of the async hot paths (token validation, /me, login, revocation)
+ASYNC_HOT_STATEMENTS = [
+    select(*AUTH_USER_COLUMNS).where(User.id == _NO_ID),
+    select(User.updated_at, User.is_active).where(User.id == _NO_ID),
+    select(*USER_COLUMNS, User.updated_at).where(User.id == _NO_ID),
+    select(User.id).where(User.email == ""),
+    login_query(""),
+    select(RevokedToken.jti).where(RevokedToken.jti == ""),
+]
+
+# Statements of the OAuth callbacks, which use the synchronous engine
+SYNC_HOT_STATEMENTS = [
+    select(OAuthAccount).where(OAuthAccount.provider == "", OAuthAccount.provider_user_id == ""),
+    select(User).where(User.email == ""),
+]
+
+async def _warm_async_engine(engine: AsyncEngine, connections: int):
+    """Open connections together so the pool keeps them, priming each one's prepared statements."""
+    connections = max(1, min(connections, engine.pool.size()))
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+        for conn in opened:
+            for stmt in ASYNC_HOT_STATEMENTS:
+                await conn.execute(stmt)
+    finally:
+        for conn in opened:
+            await conn.close()
+
+def _warm_sync_engine(connections: int):
+    connections = max(1, min(connections, models.engine.pool.size()))
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(models.engine.connect())
+        for conn in opened:
+            for stmt in SYNC_HOT_STATEMENTS:
+                conn.execute(stmt)
+    finally:
+        for conn in opened:
+            conn.close()
+
+def _warm_password_hashing():
+    pwd_context.verify("warmup", pwd_context.hash("warmup"))
+
+async def warm_origins(origins: List[str]):
+    """Open a TLS connection to each origin in the shared provider pool."""
+    client = get_provider_client()
+    for origin in origins:
+        # Any answer will do, only the connection matters
+        await client.head(origin)
+
+class Warmup:
+    """
+    Prepare a worker for traffic: DB pools, statement caches, hashing backends
+    and provider connections. Each step is recorded for /health/ready.
+    """
+
+    def __init__(self):
+        self.done = False
+        self.steps: Dict[str, dict] = {}
+
+    async def _step(self, name: str, func: Callable[[], Awaitable[object]]):
+        started = time.perf_counter()
+        try:
+            await func()
+            self.steps[name] = {"ok": True}
+        except Exception as e:
+            logger.warning(f"Warmup step '{name}' failed: {e}")
+            self.steps[name] = {"ok": False, "error": str(e)}
+        self.steps[name]["ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(
+        self,
+        connections: int = WARMUP_DB_CONNECTIONS,
+        providers: Optional[Dict[str, Callable[[], Awaitable[object]]]] = None
+    ):
+        started = time.perf_counter()
+        await self._step("database", lambda: _warm_async_engine(database.engine, connections))
+        for replica in database.replicas.replicas:
+            await self._step(f"replica {replica.host}", lambda engine=replica.engine: _warm_async_engine(engine, connections))
+        await self._step("database (sync)", lambda: run_in_threadpool(_warm_sync_engine, connections))
+        # Loads the hashing backends and their parameters
+        await self._step("password hashing", lambda: run_in_threadpool(_warm_password_hashing))
+        for name, warm in (providers or {}).items():
+            await self._step(f"provider {name}", warm)
+        self.done = True
+        logger.info(f"Warmup finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+warmup = Warmup()
+
+async def check_database(engine: AsyncEngine = database.engine, timeout: float = HEALTH_CHECK_TIMEOUT_SECONDS) -> dict:
+    """Round trip to the database within the timeout."""
+    started = time.perf_counter()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.wait_for(ping(), timeout)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
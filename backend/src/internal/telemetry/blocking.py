@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from internal.config.config import BLOCKING_THRESHOLD_MS, BLOCKING_REPORT_FILE
+
+logger = logging.getLogger(__name__)
+
+# Frames from these directories are the application's own code
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Our own middlewares wrap every request, they never are the culprit
+MIDDLEWARE_DIRS = tuple(os.path.join(APP_ROOT, "internal", name) + os.sep for name in ("middleware", "telemetry"))
+# Frames kept in the sample stack of each stall
+STACK_DEPTH = 25
+
+def _is_app_frame(frame: traceback.FrameSummary) -> bool:
+    return frame.filename.startswith(APP_ROOT) and "site-packages" not in frame.filename
+
+def _is_culprit_frame(frame: traceback.FrameSummary) -> bool:
+    return _is_app_frame(frame) and not frame.filename.startswith(MIDDLEWARE_DIRS)
+
+def _location(frame: Optional[traceback.FrameSummary]) -> Optional[str]:
+    if frame is None:
+        return None
+    return f"{os.path.relpath(frame.filename, APP_ROOT) if _is_app_frame(frame) else frame.filename}:{frame.lineno} in {frame.name}"
+
+class BlockingDetector:
+    """
+    Find the code holding the event loop.
+    A sidecar thread keeps scheduling a no-op on the loop; when it is not run
+    within the threshold, the loop thread's stack is captured and, once the
+    loop is free again, the stall is recorded under the route being handled
+    and the innermost application frame.
+    """
+
+    def __init__(self, threshold_ms: float = BLOCKING_THRESHOLD_MS, report_file: str = BLOCKING_REPORT_FILE):
+        self.threshold = threshold_ms / 1000
+        self.report_file = report_file
+        self.stalls: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Task -> ASGI scope of the request it serves, filled by the middleware
+        self.requests: Dict[asyncio.Task, dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start watching the running loop."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._running.set()
+        self._thread = threading.Thread(target=self._watch, name="blocking-detector", daemon=True)
+        self._thread.start()
+        logger.warning(f"Blocking-call detector enabled, threshold {self.threshold * 1000:.0f} ms")
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=self.threshold * 2 + 1)
+            self._thread = None
+
+    def _current_route(self) -> str:
+        # Read from the sidecar thread while the loop is stuck, good enough for a diagnostic
+        try:
+            task = asyncio.tasks._current_tasks.get(self._loop)
+        except AttributeError:
+            task = None
+        scope = self.requests.get(task) if task is not None else None
+        if scope is None:
+            return "(no request)"
+        route = scope.get("route")
+        return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+    def _watch(self):
+        while self._running.is_set():
+            answered = threading.Event()
+            started = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # The loop is closed
+                return
+            if answered.wait(self.threshold):
+                time.sleep(self.threshold / 2)
+                continue
+
+            # The loop is stuck: capture what it is running right now
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.extract_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+            route = self._current_route()
+            while not answered.wait(1) and self._running.is_set():
+                pass
+            self._record(route, stack, (time.monotonic() - started) * 1000)
+
+    def _record(self, route: str, stack: List[traceback.FrameSummary], duration_ms: float):
+        app_frames = [frame for frame in stack if _is_culprit_frame(frame)]
+        location = _location(app_frames[-1] if app_frames else (stack[-1] if stack else None)) or "(unknown)"
+        blocking_call = _location(stack[-1] if stack else None)
+
+        with self._lock:
+            entry = self.stalls.setdefault((route, location), {
+                "route": route,
+                "location": location,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+            })
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            if duration_ms >= entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                entry["blocking_call"] = blocking_call
+                entry["stack"] = [_location(frame) for frame in stack]
+
+        if self.report_file:
+            line = {"route": route, "location": location, "blocking_call": blocking_call, "duration_ms": round(duration_ms, 1)}
+            with open(self.report_file, "ab") as f:
+                f.write(orjson.dumps(line) + b"\n")
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Stalls per route and code location, the costliest first."""
+        with self._lock:
+            entries = [dict(entry) for entry in self.stalls.values()]
+        for entry in entries:
+            entry["total_ms"] = round(entry["total_ms"], 1)
+            entry["max_ms"] = round(entry["max_ms"], 1)
+        return sorted(entries, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.stalls.clear()
+
+blocking_detector = BlockingDetector()
+
+class BlockingRouteMiddleware:
+    """Remember which request each task serves, so stalls can be attributed to a route."""
+
+    def __init__(self, app, detector: BlockingDetector = blocking_detector):
+        self.app = app
+        self.detector = detector
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        self.detector.requests[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.detector.requests.pop(task, None)
@@ -0,0 +1,88 @@
+import logging
+from typing import Optional
+
+from fastapi import FastAPI
+from opentelemetry import trace
+
+from internal.config.config import (
+    OTEL_TRACING,
+    OTEL_SERVICE_NAME,
+    OTEL_TRACES_SAMPLER_RATIO,
+    OTEL_TRACES_EXPORTER,
+    OTEL_TRACES_FILE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tracer for the manual spans (a no-op until setup_tracing installs a provider)
+tracer = trace.get_tracer("auth-backend")
+
+_provider = None
+_traces_file = None
+
+def _build_exporter(kind: str):
+    """Span exporter selected by OTEL_TRACES_EXPORTER."""
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if kind == "otlp":
+        # Endpoint, headers and timeout come from the standard OTEL_EXPORTER_OTLP_* variables
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "file":
+        # No collector needed, one JSON span per line
+        global _traces_file
+        _traces_file = open(OTEL_TRACES_FILE, "a", buffering=1)
+        return ConsoleSpanExporter(out=_traces_file, formatter=lambda span: span.to_json(indent=None) + "\n")
+    raise ValueError(f"Unsupported OTEL_TRACES_EXPORTER: {kind}")
+
+def setup_tracing(app: FastAPI, ratio: float = OTEL_TRACES_SAMPLER_RATIO, exporter: Optional[str] = None) -> bool:
+    """
+    Install the tracer provider and instrument FastAPI, the SQLAlchemy engines,
+    httpx (OAuth providers, Graph) and requests (MSAL). Returns False when disabled.
+    """
+    global _provider
+    if OTEL_TRACING != "true" or _provider is not None:
+        return False
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    from internal.database import database, models
+
+    # Child spans follow the decision of their parent, so traces are never partial
+    _provider = TracerProvider(
+        resource=Resource.create({SERVICE_NAME: OTEL_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(ratio))
+    )
+    # Spans are exported from a background thread, never on the request path
+    exporter = exporter or OTEL_TRACES_EXPORTER
+    _provider.add_span_processor(BatchSpanProcessor(_build_exporter(exporter)))
+    trace.set_tracer_provider(_provider)
+
+    engines = [database.engine.sync_engine, models.engine]
+    engines += [replica.engine.sync_engine for replica in database.replicas.replicas]
+    SQLAlchemyInstrumentor().instrument(engines=engines, tracer_provider=_provider)
+    HTTPXClientInstrumentor().instrument(tracer_provider=_provider)
+    RequestsInstrumentor().instrument(tracer_provider=_provider)
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_provider)
+
+    logger.info(f"Tracing enabled ({exporter} exporter, sampling ratio {ratio})")
+    return True
+
+def shutdown_tracing():
+    """Flush the pending spans."""
+    global _provider, _traces_file
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+    if _traces_file is not None:
+        _traces_file.close()
+        _traces_file = None
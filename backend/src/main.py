@@ -1,18 +1,130 @@
+import asyncio
 import os
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import fastapi.security
 import uvicorn
   
-from routers import authentication, data
+from routers import authentication, data, debug, health, well_known
+from routers.auth import microsoft
+from routers.auth.microsoft import membership_sync
+from internal.api.responses import FastJSONResponse
+from internal.auth.breached import breached_passwords
+from internal.auth.graph import close_http_client
+from internal.auth.login_events import login_events
+from internal.auth.oauth import OAUTH_PROVIDERS, close_provider_client
+from internal.auth.revocation import revocations
+from internal.config.config import (
+    AUTH_FACEBOOK,
+    AUTH_GOOGLE,
+    AUTH_MICROSOFT,
+    AUTH_STRAVA,
+    BLOCKING_DETECTOR,
+    BREACHED_PASSWORDS_RELOAD_SECONDS,
+    DATABASE_REPLICA_CHECK_SECONDS,
+    GZIP_MINIMUM_SIZE,
+    REVOCATION_REFRESH_SECONDS,
+    SESSION_PARTITION_MAINTENANCE_SECONDS,
+    WARMUP_PROVIDERS,
+)
+from internal.database.database import replicas
+from internal.database.partitions import maintain_session_partitions
+from internal.middleware.admission import AdmissionMiddleware, loop_lag
+from internal.tasks.periodic import PeriodicTask
+from internal.tasks.warmup import warm_origins, warmup
+from internal.telemetry.blocking import BlockingRouteMiddleware, blocking_detector
+from internal.telemetry.logs import RequestIdMiddleware, setup_logging
+from internal.telemetry.tracing import setup_tracing, shutdown_tracing
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (JSON records written by a background thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Keeps daily user_sessions partitions created ahead and drops expired ones
+session_partitions = PeriodicTask(
+    "session partition maintenance",
+    maintain_session_partitions,
+    SESSION_PARTITION_MAINTENANCE_SECONDS
+)
+
+# Keeps track of which read replicas are reachable and caught up
+replica_health = PeriodicTask(
+    "read replica health check",
+    replicas.check,
+    DATABASE_REPLICA_CHECK_SECONDS
+)
+
+# Keeps the token revocation filter of this worker in sync with the denylist
+revocation_refresh = PeriodicTask(
+    "token revocation refresh",
+    revocations.refresh,
+    REVOCATION_REFRESH_SECONDS
+)
+
+# Maps the breached password filter again whenever the file is replaced
+breached_password_reload = PeriodicTask(
+    "breached password filter reload",
+    breached_passwords.refresh,
+    BREACHED_PASSWORDS_RELOAD_SECONDS
+)
+
+def provider_warmers() -> dict:
+    """Pre-connection of each enabled provider, run by the warmup."""
+    warmers = {}
+    if WARMUP_PROVIDERS != "true":
+        return warmers
+    for name, enabled in (("google", AUTH_GOOGLE), ("facebook", AUTH_FACEBOOK), ("strava", AUTH_STRAVA)):
+        if enabled == "true":
+            warmers[name] = lambda origins=OAUTH_PROVIDERS[name].origins(): warm_origins(origins)
+    if AUTH_MICROSOFT == "true":
+        warmers["microsoft"] = microsoft.warm_up
+    return warmers
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    loop_lag.start()
+    if BLOCKING_DETECTOR == "true":
+        blocking_detector.start()
+    session_partitions.start()
+    revocation_refresh.start()
+    login_events.start()
+    if breached_passwords.enabled:
+        # Mapped here, the periodic task (0 disables it) only picks up replaced files
+        try:
+            breached_passwords.reload()
+        except Exception:
+            logger.exception("Could not load the breached password filter, the check is off")
+        breached_password_reload.start()
+    if replicas.enabled:
+        replica_health.start()
+    if AUTH_MICROSOFT == "true":
+        membership_sync.start()
+    # Warm up in the background, /health/ready reports when it is done
+    warmup_task = asyncio.create_task(warmup.run(providers=provider_warmers()), name="warmup")
+    yield
+    warmup_task.cancel()
+    await membership_sync.stop()
+    await session_partitions.stop()
+    await replica_health.stop()
+    await revocation_refresh.stop()
+    await breached_password_reload.stop()
+    await revocations.close()
+    # Writes the login history still buffered
+    await login_events.stop()
+    await replicas.dispose()
+    await close_http_client()
+    await close_provider_client()
+    shutdown_tracing()
+    await loop_lag.stop()
+    blocking_detector.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+setup_tracing(app)
 
 main_router = APIRouter(
     prefix=os.getenv("BACKEND_API_DEFAULT_ROUTE"),
@@ -20,6 +132,10 @@ main_router = APIRouter(
 )
 main_router.include_router(authentication.router)
 main_router.include_router(data.router)
+main_router.include_router(well_known.router)
+main_router.include_router(health.router)
+if BLOCKING_DETECTOR == "true":
+    main_router.include_router(debug.router)
 
 @app.get("/", tags=["Root"])
 async def read_root():
@@ -28,15 +144,22 @@ async def read_root():
 
 app.include_router(main_router)
 
+if BLOCKING_DETECTOR == "true":
+    app.add_middleware(BlockingRouteMiddleware)
+# Sheds low priority requests first when the worker falls behind
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # Update this to restrict origins in production
     #allow_origins=["*"],  # Update this to restrict origins in production
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With", "If-None-Match"],
     #allow_headers=["*"],
+    expose_headers=["X-Request-ID", "ETag"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+app.add_middleware(RequestIdMiddleware)
 
 if __name__ == "__main__":
     host = os.getenv("BACKEND_API_HOST")
@@ -50,6 +173,6 @@ if __name__ == "__main__":
     port = int(port_str)
     
     if os.getenv("ENV") != "prod":
-        uvicorn.run("main:app", host=host, port=port, reload=True, log_level="info")
+        uvicorn.run("main:app", host=host, port=port, reload=True, log_level="info", log_config=None)
     else:
-        uvicorn.run(app, host=host, port=port)
\ No newline at end of file
+        uvicorn.run(app, host=host, port=port, log_config=None)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Baseline schema, as previously created by deployment/init.sql
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+
+Every statement is IF NOT EXISTS, so databases created from the old init.sql
+can run `alembic upgrade head` directly.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _timestamp(name: str, **kwargs) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now(), **kwargs)
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+
+    op.create_table(
+        "users",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("uuid_generate_v4()")),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("username", sa.String(100)),
+        sa.Column("full_name", sa.String(255)),
+        sa.Column("avatar_url", sa.Text),
+        sa.Column("is_active", sa.Boolean, server_default=sa.text("true")),
+        sa.Column("is_verified", sa.Boolean, server_default=sa.text("false")),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "user_passwords",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("uuid_generate_v4()")),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "oauth_accounts",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("uuid_generate_v4()")),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("provider_user_id", sa.String(255), nullable=False),
+        sa.Column("provider_email", sa.String(255)),
+        sa.Column("access_token", sa.Text),
+        sa.Column("refresh_token", sa.Text),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        sa.UniqueConstraint("provider", "provider_user_id"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "user_sessions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("uuid_generate_v4()")),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+        sa.Column("session_token", sa.String(255), nullable=False, unique=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        _timestamp("created_at"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "graph_groups",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("display_name", sa.String(255)),
+        sa.Column("description", sa.Text),
+        _timestamp("synced_at"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "graph_group_members",
+        sa.Column("group_id", sa.String(64), sa.ForeignKey("graph_groups.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("member_id", sa.String(64), primary_key=True),
+        sa.Column("member_type", sa.String(100)),
+        sa.Column("display_name", sa.String(255)),
+        sa.Column("mail", sa.String(255)),
+        sa.Column("user_principal_name", sa.String(255)),
+        _timestamp("synced_at"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "graph_sync_state",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("delta_link", sa.Text),
+        sa.Column("last_synced_at", sa.DateTime(timezone=True)),
+        sa.Column("last_full_sync_at", sa.DateTime(timezone=True)),
+        if_not_exists=True,
+    )
+
+    # The tables are empty at this point, no need to build these concurrently
+    op.create_index("idx_users_email", "users", ["email"], if_not_exists=True)
+    op.create_index("idx_users_created_at_id", "users", ["created_at", "id"], if_not_exists=True)
+    op.create_index("idx_oauth_accounts_provider_user_id", "oauth_accounts", ["provider", "provider_user_id"], if_not_exists=True)
+    op.create_index("idx_user_sessions_token", "user_sessions", ["session_token"], if_not_exists=True)
+    op.create_index("idx_user_sessions_user_id", "user_sessions", ["user_id"], if_not_exists=True)
+
+def downgrade():
+    op.drop_table("graph_sync_state")
+    op.drop_table("graph_group_members")
+    op.drop_table("graph_groups")
+    op.drop_table("user_sessions")
+    op.drop_table("oauth_accounts")
+    op.drop_table("user_passwords")
+    op.drop_table("users")
@@ -0,0 +1,73 @@
+"""Range-partition user_sessions on expires_at
+
+Revision ID: 0002_partition_user_sessions
+Revises: 0001_baseline
+Create Date: 2026-10-19
+
+One partition per UTC day of expires_at, created ahead of time and dropped once
+expired by internal/database/partitions.py, plus a default partition for sessions
+no daily partition covers yet. Sessions still valid are carried over.
+Postgres requires the partition key in every unique constraint, so the primary
+key becomes (id, expires_at) and the constraint on the token becomes
+(session_token, expires_at): the database no longer rejects a reused token with
+another expiry. Tokens are random UUIDs, their uniqueness now rests on that.
+"""
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+
+from internal.config.config import SESSION_PARTITION_DAYS_AHEAD
+from internal.database.partitions import create_default_partition_sql, create_partition_sql
+
+revision = "0002_partition_user_sessions"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE TEMP TABLE user_sessions_live ON COMMIT DROP AS SELECT * FROM user_sessions WHERE expires_at > now()")
+    op.execute("DROP TABLE user_sessions")
+    op.execute("""
+        CREATE TABLE user_sessions (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+            session_token VARCHAR(255) NOT NULL,
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, expires_at),
+            UNIQUE (session_token, expires_at)
+        ) PARTITION BY RANGE (expires_at)
+    """)
+
+    today = datetime.now(timezone.utc).date()
+    for offset in range(SESSION_PARTITION_DAYS_AHEAD + 1):
+        op.execute(create_partition_sql(today + timedelta(days=offset)))
+    op.execute(create_default_partition_sql())
+
+    # Indexes on the partitioned parent cascade to every partition
+    op.execute("CREATE INDEX idx_user_sessions_token ON user_sessions (session_token)")
+    op.execute("CREATE INDEX idx_user_sessions_user_id ON user_sessions (user_id)")
+
+    op.execute("""
+        INSERT INTO user_sessions (id, user_id, session_token, expires_at, created_at)
+        SELECT id, user_id, session_token, expires_at, created_at FROM user_sessions_live
+    """)
+
+def downgrade():
+    op.execute("CREATE TEMP TABLE user_sessions_live ON COMMIT DROP AS SELECT * FROM user_sessions")
+    op.execute("DROP TABLE user_sessions")
+    op.execute("""
+        CREATE TABLE user_sessions (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+            session_token VARCHAR(255) UNIQUE NOT NULL,
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("CREATE INDEX idx_user_sessions_token ON user_sessions (session_token)")
+    op.execute("CREATE INDEX idx_user_sessions_user_id ON user_sessions (user_id)")
+    op.execute("""
+        INSERT INTO user_sessions (id, user_id, session_token, expires_at, created_at)
+        SELECT id, user_id, session_token, expires_at, created_at FROM user_sessions_live
+    """)
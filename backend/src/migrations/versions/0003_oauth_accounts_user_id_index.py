@@ -0,0 +1,34 @@
+"""Index oauth_accounts.user_id
+
+Revision ID: 0003_oauth_accounts_user_id_index
+Revises: 0002_partition_user_sessions
+Create Date: 2026-10-19
+
+Backs User.oauth_accounts and the ON DELETE CASCADE from users, which
+otherwise scan the whole table. Built concurrently so writes keep flowing.
+"""
+from alembic import op
+
+revision = "0003_oauth_accounts_user_id_index"
+down_revision = "0002_partition_user_sessions"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_oauth_accounts_user_id",
+            "oauth_accounts",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_oauth_accounts_user_id",
+            table_name="oauth_accounts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,58 @@
+"""Drop indexes duplicating unique constraints, index user_passwords.user_id
+
+Revision ID: 0004_drop_redundant_indexes
+Revises: 0003_oauth_accounts_user_id_index
+Create Date: 2026-10-19
+
+- idx_users_email duplicates users_email_key
+- idx_oauth_accounts_provider_user_id duplicates the (provider, provider_user_id) unique key
+- idx_user_sessions_token is a prefix of the (session_token, expires_at) unique key
+Each one only cost write amplification. The login password lookup by
+user_id had no index at all and fell back to a sequential scan.
+Reported by `python -m tools.check_query_plans`.
+"""
+from alembic import op
+
+revision = "0004_drop_redundant_indexes"
+down_revision = "0003_oauth_accounts_user_id_index"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_user_passwords_user_id",
+            "user_passwords",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("idx_users_email", table_name="users", postgresql_concurrently=True, if_exists=True)
+        op.drop_index(
+            "idx_oauth_accounts_provider_user_id",
+            table_name="oauth_accounts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    # Indexes of partitioned tables cannot be dropped concurrently: this drops the index of
+    # every partition under an ACCESS EXCLUSIVE lock on user_sessions, blocking session
+    # reads and writes (logins, token checks) until it commits. Quick, but run it off-peak.
+    op.drop_index("idx_user_sessions_token", table_name="user_sessions", if_exists=True)
+
+def downgrade():
+    op.create_index("idx_user_sessions_token", "user_sessions", ["session_token"], if_not_exists=True)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_oauth_accounts_provider_user_id",
+            "oauth_accounts",
+            ["provider", "provider_user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index("idx_users_email", "users", ["email"], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index(
+            "idx_user_passwords_user_id",
+            table_name="user_passwords",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,29 @@
+"""Add revoked_tokens
+
+Revision ID: 0005_revoked_tokens
+Revises: 0004_drop_redundant_indexes
+Create Date: 2026-10-19
+
+Denylist of access token ids (jti) revoked before their expiry. Rows are only
+needed until the token expires and are purged by internal/auth/revocation.py.
+"""
+from alembic import op
+
+revision = "0005_revoked_tokens"
+down_revision = "0004_drop_redundant_indexes"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti VARCHAR(64) PRIMARY KEY,
+            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            revoked_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens (expires_at)")
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS revoked_tokens")
@@ -0,0 +1,33 @@
+"""Add login_events and users.last_login_at
+
+Revision ID: 0006_login_events
+Revises: 0005_revoked_tokens
+Create Date: 2026-10-19
+
+Per-user login history and the time of the latest login, both written in
+batches by internal/auth/login_events.py.
+"""
+from alembic import op
+
+revision = "0006_login_events"
+down_revision = "0005_revoked_tokens"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS last_login_at TIMESTAMP WITH TIME ZONE")
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS login_events (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            provider VARCHAR(50) NOT NULL,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(512),
+            logged_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_login_events_user_id_logged_at ON login_events (user_id, logged_at)")
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS login_events")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS last_login_at")
@@ -0,0 +1,23 @@
+"""Make users.created_at NOT NULL
+
+Revision ID: 0007_users_created_at_not_null
+Revises: 0006_login_events
+Create Date: 2026-10-19
+
+The admin user listing pages on (created_at, id): a NULL created_at cannot
+be encoded in a cursor and falls out of the keyset comparison. The column
+already defaults to now(), rows left NULL get the time of the migration.
+"""
+from alembic import op
+
+revision = "0007_users_created_at_not_null"
+down_revision = "0006_login_events"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("UPDATE users SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("ALTER TABLE users ALTER COLUMN created_at SET NOT NULL")
+
+def downgrade():
+    op.execute("ALTER TABLE users ALTER COLUMN created_at DROP NOT NULL")
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from datetime import timedelta, datetime
+from datetime import timedelta
 import secrets
 
-from internal.database.models import get_db, User, OAuthAccount
+from internal.database.models import get_db, utcnow, User, OAuthAccount
+from internal.api.responses import FastJSONResponse
+from internal.auth.login_events import login_events
 from internal.auth.schemas import Token, UserResponse, OAuthURL
 from internal.auth.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from internal.auth.oauth import get_oauth_provider, normalize_user_data
@@ -27,7 +29,7 @@ async def facebook_login():
     }
 
 @router.get("/callback", response_model=Token)
-async def facebook_callback(code: str, state: str = None, db: Session = Depends(get_db)):
+async def facebook_callback(request: Request, code: str, state: str = None, db: Session = Depends(get_db)):
     """Handle Facebook OAuth callback."""
     provider = get_oauth_provider("facebook")
     
@@ -57,7 +59,7 @@ async def facebook_callback(code: str, state: str = None, db: Session = Depends(
             oauth_account.access_token = access_token
             oauth_account.refresh_token = token_data.get("refresh_token")
             if token_data.get("expires_in"):
-                oauth_account.expires_at = datetime.utcnow() + timedelta(seconds=int(token_data["expires_in"]))
+                oauth_account.expires_at = utcnow() + timedelta(seconds=int(token_data["expires_in"]))
             
             user = oauth_account.user
         else:
@@ -88,11 +90,12 @@ async def facebook_callback(code: str, state: str = None, db: Session = Depends(
                 refresh_token=token_data.get("refresh_token")
             )
             if token_data.get("expires_in"):
-                oauth_account.expires_at = datetime.utcnow() + timedelta(seconds=int(token_data["expires_in"]))
+                oauth_account.expires_at = utcnow() + timedelta(seconds=int(token_data["expires_in"]))
             
             db.add(oauth_account)
         
         db.commit()
+        login_events.record(user.id, "facebook", request)
         
         # Create JWT token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -100,11 +103,11 @@ async def facebook_callback(code: str, state: str = None, db: Session = Depends(
             data={"sub": str(user.id)}, expires_delta=access_token_expires
         )
         
-        return {
-            "access_token": jwt_token,
-            "token_type": "bearer",
-            "user": UserResponse.from_orm(user)
-        }
+        return FastJSONResponse(Token(
+            access_token=jwt_token,
+            token_type="bearer",
+            user=UserResponse.model_validate(user)
+        ))
         
     except Exception as e:
         raise HTTPException(
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from sqlalchemy.orm import Session
-from datetime import timedelta, datetime
+from typing import Optional
+from datetime import timedelta
 import msal
 import requests
 import secrets
 
-from internal.database.models import get_db, User, OAuthAccount
-from internal.auth.schemas import Token, UserResponse, OAuthURL
+from internal.database.database import get_db as get_async_db
+from internal.database.models import get_db, utcnow, User, OAuthAccount, GraphGroupMember
+from internal.api.responses import FastJSONResponse
+from internal.auth.login_events import login_events
+from internal.auth.schemas import Token, UserResponse, OAuthURL, GroupMembersBatchRequest
 from internal.auth.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from internal.auth.graph import GraphError, get_http_client, graph_url, graph_batch_get, iter_graph_items, iter_graph_pages
+from internal.auth.graph_sync import get_membership_sync_state, staleness_seconds, sync_group_memberships
+from internal.tasks.periodic import PeriodicTask
+from internal.telemetry.tracing import tracer
+from internal.api.responses import ndjson_response
 import internal.config.config as config
 
 router = APIRouter(
@@ -25,6 +38,10 @@ USER_SCOPE = config.ENTRA_ID_USER_SCOPE.split(",")
 # Application scope
 APPLICATION_SCOPE = config.ENTRA_ID_APPLICATION_SCOPE.split(",")
 
+# Properties requested from Graph for groups and members
+GROUP_SELECT = "id,displayName,description"
+MEMBER_SELECT = "id,displayName,mail,userPrincipalName"
+
 REDIRECT_URI = f"http://{config.BACKEND_API_HOST}:{config.BACKEND_API_PORT}{config.BACKEND_API_DEFAULT_ROUTE}/auth/microsoft/callback"
 
 # MSAL Client
@@ -50,14 +67,15 @@ async def microsoft_login():
     }
 
 @router.get("/callback", response_model=Token)
-async def microsoft_callback(code: str, state: str = None, db: Session = Depends(get_db)):
+async def microsoft_callback(request: Request, code: str, state: str = None, db: Session = Depends(get_db)):
     """Handle Microsoft OAuth callback."""
     try:
-        result = msal_client.acquire_token_by_authorization_code(
-            code,
-            scopes=USER_SCOPE,
-            redirect_uri=REDIRECT_URI
-        )
+        with tracer.start_as_current_span("msal.acquire_token_by_authorization_code"):
+            result = msal_client.acquire_token_by_authorization_code(
+                code,
+                scopes=USER_SCOPE,
+                redirect_uri=REDIRECT_URI
+            )
         
         if "access_token" not in result:
             raise HTTPException(
@@ -90,7 +108,7 @@ async def microsoft_callback(code: str, state: str = None, db: Session = Depends
             oauth_account.access_token = access_token
             oauth_account.refresh_token = result.get("refresh_token")
             if result.get("expires_in"):
-                oauth_account.expires_at = datetime.utcnow() + timedelta(seconds=int(result["expires_in"]))
+                oauth_account.expires_at = utcnow() + timedelta(seconds=int(result["expires_in"]))
             
             user = oauth_account.user
         else:
@@ -121,11 +139,12 @@ async def microsoft_callback(code: str, state: str = None, db: Session = Depends
                 refresh_token=result.get("refresh_token")
             )
             if result.get("expires_in"):
-                oauth_account.expires_at = datetime.utcnow() + timedelta(seconds=int(result["expires_in"]))
+                oauth_account.expires_at = utcnow() + timedelta(seconds=int(result["expires_in"]))
             
             db.add(oauth_account)
         
         db.commit()
+        login_events.record(user.id, "microsoft", request)
         
         # Create JWT token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -133,11 +152,11 @@ async def microsoft_callback(code: str, state: str = None, db: Session = Depends
             data={"sub": str(user.id)}, expires_delta=access_token_expires
         )
         
-        return {
-            "access_token": jwt_token,
-            "token_type": "bearer",
-            "user": UserResponse.from_orm(user)
-        }
+        return FastJSONResponse(Token(
+            access_token=jwt_token,
+            token_type="bearer",
+            user=UserResponse.model_validate(user)
+        ))
         
     except Exception as e:
         raise HTTPException(
@@ -148,26 +167,44 @@ async def microsoft_callback(code: str, state: str = None, db: Session = Depends
 # Keep the existing app-token and groups endpoints for backward compatibility
 @router.get("/app-token")
 async def get_app_token():
-    result = msal_client.acquire_token_for_client(scopes=APPLICATION_SCOPE)
+    with tracer.start_as_current_span("msal.acquire_token_for_client"):
+        result = msal_client.acquire_token_for_client(scopes=APPLICATION_SCOPE)
     if "access_token" in result:
         return {"access_token": result["access_token"]}
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to obtain application token")
 
 def get_access_token():
-    result = msal_client.acquire_token_for_client(scopes=APPLICATION_SCOPE)
+    with tracer.start_as_current_span("msal.acquire_token_for_client"):
+        result = msal_client.acquire_token_for_client(scopes=APPLICATION_SCOPE)
     if "access_token" in result:
         return result["access_token"]
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to obtain token")
 
+async def acquire_app_token() -> str:
+    """Get an application token without blocking the event loop on MSAL."""
+    return await run_in_threadpool(get_access_token)
+
+async def warm_up():
+    """Fill MSAL's token cache and open the Graph connection before the first request needs them."""
+    await acquire_app_token()
+    await get_http_client().head(config.GRAPH_API_BASE_URL)
+
+# Background job filling the local group membership store (started by the app lifespan)
+membership_sync = PeriodicTask(
+    "group membership sync",
+    lambda: sync_group_memberships(acquire_app_token),
+    config.GRAPH_GROUP_SYNC_INTERVAL_SECONDS
+)
+
 @router.get("/groups")
 async def get_groups():
     token = get_access_token()
     headers = {"Authorization": f"Bearer {token}"}
     # Request specific properties using $select
     params = {
-        "$select": "id,displayName,description"
+        "$select": GROUP_SELECT
     }
     response = requests.get("https://graph.microsoft.com/v1.0/groups", headers=headers, params=params)
     if response.status_code == 200:
@@ -175,16 +212,135 @@ async def get_groups():
     else:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch groups")
 
+@router.get("/groups/sync/status")
+async def get_groups_sync_status(db: AsyncSession = Depends(get_async_db)):
+    """Report the freshness of the local group membership store."""
+    state = await get_membership_sync_state(db)
+    return {
+        "enabled": membership_sync.enabled,
+        "last_synced_at": state.last_synced_at if state else None,
+        "last_full_sync_at": state.last_full_sync_at if state else None,
+        "staleness_seconds": staleness_seconds(state)
+    }
+
+@router.post("/groups/members/batch")
+async def get_groups_members_batch(batch: GroupMembersBatchRequest):
+    """Resolve the members of many groups at once through Graph JSON batching."""
+    token = await acquire_app_token()
+    # Preserve the requested order while dropping duplicates
+    group_ids = list(dict.fromkeys(str(group_id) for group_id in batch.group_ids))
+    requests_by_group = {
+        group_id: f"/groups/{group_id}/members?$select={MEMBER_SELECT}&$top=999"
+        for group_id in group_ids
+    }
+    try:
+        responses = await graph_batch_get(token, requests_by_group)
+    except GraphError as e:
+        raise HTTPException(status_code=e.status_code, detail="Failed to fetch group members")
+
+    members = {}
+    errors = {}
+    # Spill-over pages are bounded like the batches themselves
+    semaphore = asyncio.Semaphore(config.GRAPH_BATCH_CONCURRENCY)
+
+    async def collect(group_id: str):
+        response = responses[group_id]
+        body = response.get("body") or {}
+        if response["status"] != 200:
+            errors[group_id] = {
+                "status": response["status"],
+                "message": body.get("error", {}).get("message")
+            }
+            return
+        values = list(body.get("value", []))
+        # Large groups spill over to further pages outside the batch
+        next_link = body.get("@odata.nextLink")
+        if next_link:
+            try:
+                async with semaphore:
+                    async for page in iter_graph_pages(token, next_link):
+                        values.extend(page.get("value", []))
+            except GraphError as e:
+                errors[group_id] = {"status": e.status_code, "message": e.detail}
+                return
+        members[group_id] = values
+
+    await asyncio.gather(*(collect(group_id) for group_id in group_ids))
+    return {
+        "value": {group_id: members[group_id] for group_id in group_ids if group_id in members},
+        "errors": errors
+    }
+
 @router.get("/groups/{group_id}/members")
-async def get_group_members(group_id: str):
+async def get_group_members(group_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get the members of a group, from the local store once it has been synced."""
+    state = await get_membership_sync_state(db)
+    if state is not None and state.last_synced_at is not None:
+        stmt = select(
+            GraphGroupMember.member_id,
+            GraphGroupMember.display_name,
+            GraphGroupMember.mail,
+            GraphGroupMember.user_principal_name
+        ).where(GraphGroupMember.group_id == group_id)
+        result = await db.execute(stmt)
+        return {
+            "value": [
+                {
+                    "id": row.member_id,
+                    "displayName": row.display_name,
+                    "mail": row.mail,
+                    "userPrincipalName": row.user_principal_name
+                }
+                for row in result
+            ],
+            "last_synced_at": state.last_synced_at,
+            "staleness_seconds": staleness_seconds(state)
+        }
+
+    # The store has not been filled yet, ask Graph directly
     token = get_access_token()
     headers = {"Authorization": f"Bearer {token}"}
     # Request specific properties using $select
     params = {
-        "$select": "id,displayName,mail,userPrincipalName"
+        "$select": MEMBER_SELECT
     }
     response = requests.get(f"https://graph.microsoft.com/v1.0/groups/{group_id}/members", headers=headers, params=params)
     if response.status_code == 200:
         return response.json()
     else:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch group members")
+
+@router.get("/groups/stream")
+async def stream_groups(
+    page_size: int = Query(config.GRAPH_PAGE_SIZE, ge=1, le=999),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Stream every group of the tenant as NDJSON, following Graph pagination."""
+    token = await acquire_app_token()
+    params = {
+        "$select": GROUP_SELECT,
+        "$top": page_size
+    }
+    items = iter_graph_items(token, graph_url("/groups"), params, max_items=limit)
+    try:
+        return await ndjson_response(items)
+    except GraphError as e:
+        raise HTTPException(status_code=e.status_code, detail="Failed to fetch groups")
+
+@router.get("/groups/{group_id}/members/stream")
+async def stream_group_members(
+    group_id: str,
+    page_size: int = Query(config.GRAPH_PAGE_SIZE, ge=1, le=999),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Stream every member of a group as NDJSON, following Graph pagination."""
+    token = await acquire_app_token()
+    params = {
+        "$select": MEMBER_SELECT,
+        "$top": page_size
+    }
+    items = iter_graph_items(token, graph_url(f"/groups/{group_id}/members"), params, max_items=limit)
+    try:
+        return await ndjson_response(items)
+    except GraphError as e:
+        raise HTTPException(status_code=e.status_code, detail="Failed to fetch group members")
@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
 from sqlalchemy.future import select
 from datetime import timedelta
 import uuid
 
-from internal.database.database import get_db
-from internal.database.models import User, UserPassword
+from internal.database.database import get_db, mark_write, on_replica, read_session
+from internal.database.models import USER_COLUMNS, User, UserPassword
+from internal.api.responses import FastJSONResponse, etag_matches, make_etag
+from internal.auth.breached import breached_passwords
+from internal.auth.login_events import login_events
 from internal.auth.schemas import UserCreate, UserLogin, UserResponse, Token
 from internal.auth.security import (
+    credentials_exception,
     get_password_hash, 
     verify_password, 
+    password_needs_rehash,
     create_access_token, 
-    get_current_active_user,
+    fetch_token_user,
+    get_token_payload,
+    login_query,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
@@ -23,8 +32,14 @@ router = APIRouter(
 @router.post("/register", response_model=Token)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user with email and password."""
+    if breached_passwords.is_breached(user_data.password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This password appears in a known data breach, please choose another one"
+        )
+    
     # Check if user already exists
-    stmt = select(User).where(User.email == user_data.email)
+    stmt = select(User.id).where(User.email == user_data.email)
     result = await db.execute(stmt)
     existing_user = result.scalar_one_or_none()
     
@@ -47,7 +62,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     await db.refresh(user)
     
     # Create password hash
-    password_hash = get_password_hash(user_data.password)
+    password_hash = await run_in_threadpool(get_password_hash, user_data.password)
     user_password = UserPassword(
         id=uuid.uuid4(),
         user_id=user.id,
@@ -55,6 +70,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     )
     db.add(user_password)
     await db.commit()
+    mark_write(user.email)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -62,32 +78,29 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": UserResponse.model_validate(user)
-    }
+    return FastJSONResponse(Token(
+        access_token=access_token,
+        token_type="bearer",
+        user=UserResponse.model_validate(user)
+    ))
+
+async def _get_login_row(db: AsyncSession, email: str):
+    """Get the login row of a user (immutable, not tracked by the session), or None."""
+    return (await db.execute(login_query(email))).first()
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(user_credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
     """Login with email and password."""
-    # Get user
-    stmt = select(User).where(User.email == user_credentials.email)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
-    
-    # Get user password
-    stmt = select(UserPassword).where(UserPassword.user_id == user.id)
-    result = await db.execute(stmt)
-    user_password = result.scalar_one_or_none()
+    # Get user and password, from a read replica when possible
+    async with read_session(sticky_key=user_credentials.email) as read_db:
+        user = await _get_login_row(read_db, user_credentials.email)
+        replica_miss = user is None and on_replica(read_db)
+    if replica_miss:
+        # Accounts created moments ago may not have reached the replica yet
+        user = await _get_login_row(db, user_credentials.email)
     
-    if not user_password or not verify_password(user_credentials.password, user_password.password_hash):
+    # Argon2 runs in the threadpool, it would hold the event loop for its whole cost
+    if not user or not await run_in_threadpool(verify_password, user_credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -100,19 +113,57 @@ async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db))
             detail="Inactive user"
         )
     
+    # Upgrade hashes made with an older scheme or cost while we know the password
+    if password_needs_rehash(user.password_hash):
+        password_hash = await run_in_threadpool(get_password_hash, user_credentials.password)
+        await db.execute(
+            update(UserPassword)
+            .where(UserPassword.id == user.password_id)
+            .values(password_hash=password_hash)
+        )
+        await db.commit()
+        mark_write(user_credentials.email)
+    
+    login_events.record(user.id, "password", request)
+    
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": UserResponse.model_validate(user)
-    }
+    return FastJSONResponse(Token(
+        access_token=access_token,
+        token_type="bearer",
+        user=UserResponse.model_validate(user)
+    ))
+
+# Clients must revalidate, and may only store the profile privately
+ME_CACHE_CONTROL = "private, no-cache"
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
-    """Get current user information."""
-    return UserResponse.from_orm(current_user)
\ No newline at end of file
+async def get_current_user_info(request: Request, payload: dict = Depends(get_token_payload)):
+    """Get current user information, or 304 if the client's copy is current."""
+    user_id = payload["sub"]
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Revalidation only needs the version of the row
+        row = await fetch_token_user(payload, select(User.updated_at, User.is_active).where(User.id == user_id))
+        if row is not None and row.is_active:
+            etag = make_etag(user_id, row.updated_at)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": ME_CACHE_CONTROL})
+    
+    current_user = await fetch_token_user(payload, select(*USER_COLUMNS, User.updated_at).where(User.id == user_id))
+    if current_user is None:
+        raise credentials_exception()
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    
+    return FastJSONResponse(
+        UserResponse.model_validate(current_user),
+        headers={
+            "ETag": make_etag(user_id, current_user.updated_at),
+            "Cache-Control": ME_CACHE_CONTROL
+        }
+    )
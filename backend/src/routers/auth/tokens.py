@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from internal.auth.revocation import revocations
+from internal.auth.security import get_token_payload
+from internal.config.config import AUTH_VERIFY_CACHE_SECONDS
+
+router = APIRouter(
+    tags=["Tokens"]
+)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(payload: dict = Depends(get_token_payload)):
+    """Revoke the access token of the request until it expires."""
+    jti = payload.get("jti")
+    if jti is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token cannot be revoked"
+        )
+    
+    await revocations.revoke(jti, payload["sub"], datetime.fromtimestamp(payload["exp"], timezone.utc))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/verify", status_code=status.HTTP_204_NO_CONTENT)
+async def verify(payload: dict = Depends(get_token_payload)):
+    """
+    Validate the bearer token for a gateway (nginx auth_request).
+    Answers from the token alone, without loading the user, and returns the
+    identity in headers. X-Accel-Expires tells nginx how long it may cache the
+    answer, never past the token expiry.
+    """
+    expires_in = int(payload["exp"] - datetime.now(timezone.utc).timestamp())
+    headers = {
+        "X-User-Id": str(payload["sub"]),
+        "X-Token-Expires": str(payload["exp"]),
+        "X-Accel-Expires": str(max(0, min(AUTH_VERIFY_CACHE_SECONDS, expires_in))),
+        "Cache-Control": "no-store",
+    }
+    if payload.get("jti"):
+        headers["X-Token-Id"] = payload["jti"]
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
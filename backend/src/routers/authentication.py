@@ -7,6 +7,7 @@ from routers.auth.microsoft import router as microsoft_router
 from routers.auth.google import router as google_router
 from routers.auth.facebook import router as facebook_router
 from routers.auth.strava import router as strava_router
+from routers.auth.tokens import router as tokens_router
 
 from internal.config.config import (
     AUTH_EMAIL_PASSWORD,
@@ -21,6 +22,9 @@ router = APIRouter(
     tags=["auth"]
 )
 
+# Token management applies to every authentication method
+router.include_router(tokens_router)
+
 # Include the standard router last to avoid conflicts with other routes
 # Check if the authentication methods are enabled
 if AUTH_EMAIL_PASSWORD == "true":
@@ -1,8 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy import any_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import base64
+import uuid
+
+from internal.api.responses import FastJSONResponse, ndjson_response
+from internal.auth.schemas import UserPage, UserResponse, UserResolveRequest, UserResolution, UserResolveResponse
+from internal.auth.security import AuthUser, get_current_admin_user
+from internal.config.config import DATA_EXPORT_BATCH_SIZE
+from internal.database.database import AsyncSessionLocal, get_db, get_read_db
+from internal.database.models import USER_COLUMNS, User
 
 router = APIRouter(
     prefix="/data",
     tags=["data"]
 )
 
+def encode_cursor(created_at: datetime, user_id: uuid.UUID) -> str:
+    """Encode the (created_at, id) position of the last row of a page."""
+    raw = f"{created_at.isoformat()}|{user_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor returned by encode_cursor."""
+    try:
+        created_at, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def users_query(is_active: Optional[bool], is_verified: Optional[bool]):
+    """Select the listed user columns in keyset order, with optional filters."""
+    stmt = select(*USER_COLUMNS).order_by(User.created_at, User.id)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    if is_verified is not None:
+        stmt = stmt.where(User.is_verified == is_verified)
+    return stmt
+
+@router.get("/users", response_model=UserPage)
+async def list_users(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_verified: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+    admin: AuthUser = Depends(get_current_admin_user)
+):
+    """List users one page at a time, resuming after the cursor of the previous page."""
+    stmt = users_query(is_active, is_verified)
+    if cursor:
+        # Seek past the last row instead of counting an OFFSET
+        stmt = stmt.where(tuple_(User.created_at, User.id) > decode_cursor(cursor))
+    # One extra row tells whether another page follows
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return FastJSONResponse(UserPage(
+        items=[UserResponse.model_validate(row) for row in rows],
+        next_cursor=next_cursor
+    ))
+
+async def _stream_users(stmt) -> AsyncIterator[dict]:
+    # The stream outlives the request dependencies, so it owns its session
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=DATA_EXPORT_BATCH_SIZE))
+        async for row in result:
+            yield row._asdict()
+
+@router.get("/users/export")
+async def export_users(
+    is_active: Optional[bool] = None,
+    is_verified: Optional[bool] = None,
+    admin: AuthUser = Depends(get_current_admin_user)
+):
+    """Export every matching user as NDJSON through a server-side cursor."""
+    return await ndjson_response(_stream_users(users_query(is_active, is_verified)))
+
+def parse_user_key(key: str) -> Tuple[Optional[uuid.UUID], Optional[str]]:
+    """Read a resolve key as a user id or an email, (None, None) if it is neither."""
+    try:
+        return uuid.UUID(key), None
+    except ValueError:
+        pass
+    if "@" in key:
+        return None, key.strip()
+    return None, None
+
+@router.post("/users/resolve", response_model=UserResolveResponse)
+async def resolve_users(
+    request: UserResolveRequest,
+    db: AsyncSession = Depends(get_read_db),
+    admin: AuthUser = Depends(get_current_admin_user)
+):
+    """Resolve a batch of user ids and emails in one query, answering in input order."""
+    parsed = [parse_user_key(key) for key in request.keys]
+    ids = list({user_id for user_id, _ in parsed if user_id is not None})
+    emails = list({email for _, email in parsed if email is not None})
+
+    by_id: Dict[uuid.UUID, UserResponse] = {}
+    by_email: Dict[str, UserResponse] = {}
+    if ids or emails:
+        # Arrays keep it a single statement whatever the batch size
+        stmt = select(*USER_COLUMNS).where(or_(User.id == any_(ids), User.email == any_(emails)))
+        for row in (await db.execute(stmt)).all():
+            user = UserResponse.model_validate(row)
+            by_id[row.id] = user
+            by_email[row.email] = user
+
+    results: List[UserResolution] = []
+    for key, (user_id, email) in zip(request.keys, parsed):
+        if user_id is None and email is None:
+            results.append(UserResolution(key=key, status="invalid"))
+            continue
+        user = by_id.get(user_id) if user_id is not None else by_email.get(email)
+        results.append(UserResolution(key=key, status="found" if user else "not_found", user=user))
+
+    return FastJSONResponse(UserResolveResponse(results=results))
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Response, status
+
+from internal.auth.security import AuthUser, get_current_admin_user
+from internal.telemetry.blocking import blocking_detector
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"]
+)
+
+@router.get("/blocking")
+async def blocking_report(admin: AuthUser = Depends(get_current_admin_user)):
+    """Event loop stalls per route and code location, the costliest first."""
+    return {
+        "threshold_ms": blocking_detector.threshold * 1000,
+        "stalls": blocking_detector.report()
+    }
+
+@router.delete("/blocking", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_blocking_report(admin: AuthUser = Depends(get_current_admin_user)):
+    """Forget the stalls recorded so far."""
+    blocking_detector.reset()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, status
+
+from internal.api.responses import FastJSONResponse
+from internal.auth.breached import breached_passwords
+from internal.auth.login_events import login_events
+from internal.auth.revocation import revocations
+from internal.database.database import replicas
+from internal.middleware.admission import admission_stats
+from internal.tasks.warmup import check_database, warmup
+from internal.telemetry.logs import logging_stats
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"]
+)
+
+@router.get("/live")
+async def live():
+    """The worker is up and its event loop answers."""
+    return {
+        "status": "alive",
+        **admission_stats(),
+        "login_events": login_events.metrics(),
+        "logging": logging_stats()
+    }
+
+@router.get("/ready")
+async def ready():
+    """The worker is warm and its database reachable, 503 otherwise."""
+    database = await check_database()
+    is_ready = warmup.done and database["ok"]
+    return FastJSONResponse(
+        {
+            "status": "ready" if is_ready else "not ready",
+            "warmed_up": warmup.done,
+            "database": database,
+            "replicas": replicas.status(),
+            "revocation_filter_loaded": revocations.loaded,
+            "breached_password_filter": breached_passwords.status(),
+            "warmup": warmup.steps,
+        },
+        status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from internal.auth.security import get_jwks
+from internal.config.config import JWKS_CACHE_MAX_AGE_SECONDS
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["well-known"]
+)
+
+@router.get("/jwks.json")
+async def jwks(response: Response):
+    """Public keys other services use to verify our access tokens locally."""
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_CACHE_MAX_AGE_SECONDS}"
+    return get_jwks()
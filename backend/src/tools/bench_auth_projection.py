@@ -0,0 +1,120 @@
+"""
+Compare the memory cost of loading the authenticated user as ORM entities
+against the column projections now used by the auth hot path.
+
+    python -m tools.bench_auth_projection [--iterations 2000]
+
+Runs against the configured (local) database, seeding one user inside a
+transaction that is rolled back. "before" replays the former queries
+(select(User) in get_current_user, select(User) then select(UserPassword)
+in login), "after" the current ones. Each request uses its own session, as
+the app does. Reported per request: time, transient peak of traced memory,
+and the memory and blocks still held by the result, measured with tracemalloc.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from internal.auth.security import AUTH_USER_COLUMNS, AuthUser, login_query
+from internal.database.database import engine
+from internal.database.models import User, UserPassword
+
+SEED_EMAIL = "bench-projection@example.com"
+
+SEED_SQL = text("""
+WITH seeded AS (
+    INSERT INTO users (id, email, username, full_name, is_verified)
+    VALUES (:user_id, :email, 'bench', 'Bench User', true)
+    RETURNING id
+)
+INSERT INTO user_passwords (user_id, password_hash)
+SELECT id, '$argon2id$v=19$m=65536,t=3,p=4$c2FsdA$aGFzaA' FROM seeded
+""")
+
+async def current_user_before(session: AsyncSession, user_id: uuid.UUID):
+    return (await session.execute(select(User).where(User.id == user_id))).first()[0]
+
+async def current_user_after(session: AsyncSession, user_id: uuid.UUID):
+    return AuthUser(*(await session.execute(select(*AUTH_USER_COLUMNS).where(User.id == user_id))).first())
+
+async def login_before(session: AsyncSession, user_id: uuid.UUID):
+    user = (await session.execute(select(User).where(User.email == SEED_EMAIL))).scalar_one_or_none()
+    password = (await session.execute(select(UserPassword).where(UserPassword.user_id == user.id))).scalar_one_or_none()
+    return user, password
+
+async def login_after(session: AsyncSession, user_id: uuid.UUID):
+    return (await session.execute(login_query(SEED_EMAIL))).first()
+
+async def request(conn, func, user_id: uuid.UUID):
+    async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+        return await func(session, user_id)
+
+async def measure(conn, func, user_id: uuid.UUID, iterations: int) -> dict:
+    # Warm the statement caches so they are not counted against the first variant
+    for _ in range(50):
+        await request(conn, func, user_id)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await request(conn, func, user_id)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    # Transient peak of a single request
+    peaks = []
+    for _ in range(min(iterations, 200)):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await request(conn, func, user_id)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    # Memory still held by the results, as long as the request holds them
+    kept = []
+    before = tracemalloc.take_snapshot()
+    for _ in range(iterations):
+        kept.append(await request(conn, func, user_id))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    return {
+        "us": elapsed / iterations * 1e6,
+        "peak": sorted(peaks)[len(peaks) // 2],
+        "retained": sum(stat.size_diff for stat in diff) / iterations,
+        "blocks": sum(stat.count_diff for stat in diff) / iterations,
+    }
+
+async def run(iterations: int):
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            user_id = uuid.uuid4()
+            await conn.execute(SEED_SQL, {"user_id": user_id, "email": SEED_EMAIL})
+            cases = [
+                ("get_current_user", current_user_before, current_user_after),
+                ("login", login_before, login_after),
+            ]
+            for name, before, after in cases:
+                old = await measure(conn, before, user_id, iterations)
+                new = await measure(conn, after, user_id, iterations)
+                print(f"{name}")
+                print(f"  time      before {old['us']:8.1f} us   after {new['us']:8.1f} us")
+                print(f"  peak      before {old['peak']:8.0f} B    after {new['peak']:8.0f} B")
+                print(f"  retained  before {old['retained']:8.0f} B    after {new['retained']:8.0f} B")
+                print(f"  blocks    before {old['blocks']:8.1f}      after {new['blocks']:8.1f}")
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ORM entities against column projections on the auth path")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+if __name__ == "__main__":
+    main()
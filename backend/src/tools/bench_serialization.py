@@ -0,0 +1,74 @@
+"""
+Compare the per-request cost of serializing auth responses.
+
+    python -m tools.bench_serialization [--iterations 20000]
+
+"before" replays what FastAPI did when routes returned dicts under a
+response_model: the nested model is dumped, the response model validated
+again, run through jsonable_encoder and json.dumps. "after" is the current
+path: one model_validate from the ORM object, serialized once by pydantic-core.
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from internal.api.responses import FastJSONResponse
+from internal.auth.schemas import Token, UserResponse
+from internal.database.models import User
+
+ACCESS_TOKEN = "x" * 180
+
+def make_user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        email="jane.doe@example.com",
+        username="jane",
+        full_name="Jane Doe",
+        avatar_url="https://example.com/avatar.png",
+        is_active=True,
+        is_verified=True,
+        created_at=datetime.utcnow()
+    )
+
+def stdlib_render(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+def token_before(user: User) -> bytes:
+    content = {"access_token": ACCESS_TOKEN, "token_type": "bearer", "user": UserResponse.model_validate(user)}
+    # FastAPI dumps nested models to dicts before validating against the response model
+    prepared = {**content, "user": content["user"].model_dump()}
+    validated = Token.model_validate(prepared)
+    return stdlib_render(jsonable_encoder(validated.model_dump(mode="json")))
+
+def token_after(user: User) -> bytes:
+    return FastJSONResponse(Token(
+        access_token=ACCESS_TOKEN,
+        token_type="bearer",
+        user=UserResponse.model_validate(user)
+    )).body
+
+def me_before(user: User) -> bytes:
+    validated = UserResponse.model_validate(UserResponse.model_validate(user).model_dump())
+    return stdlib_render(jsonable_encoder(validated.model_dump(mode="json")))
+
+def me_after(user: User) -> bytes:
+    return FastJSONResponse(UserResponse.model_validate(user)).body
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark auth response serialization")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    user = make_user()
+    for name, before, after in [("token", token_before, token_after), ("/me", me_before, me_after)]:
+        assert json.loads(before(user)) == json.loads(after(user))
+        before_us = min(timeit.repeat(lambda: before(user), number=args.iterations, repeat=3)) / args.iterations * 1e6
+        after_us = min(timeit.repeat(lambda: after(user), number=args.iterations, repeat=3)) / args.iterations * 1e6
+        print(f"{name:6} before {before_us:7.2f} us/request  after {after_us:7.2f} us/request  ({before_us / after_us:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compile and benchmark the breached password filter (BREACHED_PASSWORDS_FILE).
+
+    python -m tools.breached_passwords compile pwned-passwords-sha1.txt breached.bloom [--error-rate 0.001]
+    python -m tools.breached_passwords compile rockyou.txt breached.bloom --plain
+    python -m tools.breached_passwords bench breached.bloom [--corpus pwned-passwords-sha1.txt] [--samples 200000]
+
+The corpus is either one SHA-1 hex digest per line, optionally followed by
+":count" (the Pwned Passwords download format), or one plain password per
+line with --plain. The filter is written next to the output and renamed over
+it, so running workers pick it up on their next reload.
+
+bench measures the false positive rate on random passwords that are not in
+the corpus against the expected rate, the lookup latency, and, with
+--corpus, that every corpus entry is found.
+"""
+import argparse
+import hashlib
+import os
+import secrets
+import sys
+import time
+from typing import Iterator
+
+from internal.auth.bloom import expected_error_rate, optimal_parameters
+from internal.auth.breached import create_filter_file, finish_filter_file, open_filter_file, password_digest
+
+def read_digests(path: str, plain: bool) -> Iterator[bytes]:
+    """SHA-1 digests of the corpus entries."""
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            if plain:
+                yield hashlib.sha1(line).digest()
+            else:
+                yield bytes.fromhex(line.split(b":", 1)[0].decode())
+
+def count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+def compile_filter(corpus: str, output: str, error_rate: float, plain: bool):
+    started = time.perf_counter()
+    capacity = count_lines(corpus)
+    num_bits, num_hashes = optimal_parameters(capacity, error_rate)
+    print(f"{capacity} passwords: {num_bits // 8 / 2**20:.1f} MiB, {num_hashes} hashes")
+
+    # Filled through a writable mapping, so the bits never need to fit in memory twice
+    tmp_path = output + ".tmp"
+    bloom, mapped = create_filter_file(tmp_path, num_bits, num_hashes)
+    try:
+        for digest in read_digests(corpus, plain):
+            bloom.add(digest)
+            if bloom.count % 1_000_000 == 0:
+                print(f"{bloom.count} added")
+        finish_filter_file(bloom, mapped)
+    finally:
+        del bloom
+        mapped.close()
+    os.replace(tmp_path, output)
+    print(f"Wrote {output} in {time.perf_counter() - started:.1f}s")
+
+def bench(path: str, samples: int, corpus: str, plain: bool):
+    started = time.perf_counter()
+    bloom = open_filter_file(path)
+    print(f"Opened in {(time.perf_counter() - started) * 1e6:.0f} us: {bloom.count} passwords, "
+          f"{bloom.num_bits // 8 / 2**20:.1f} MiB, {bloom.num_hashes} hashes")
+
+    # Random passwords are, for all practical purposes, absent from any corpus
+    passwords = [secrets.token_urlsafe(12) for _ in range(samples)]
+    started = time.perf_counter()
+    false_positives = sum(1 for password in passwords if password_digest(password) in bloom)
+    elapsed = time.perf_counter() - started
+    expected = expected_error_rate(bloom.num_bits, bloom.num_hashes, bloom.count)
+    print(f"False positive rate {false_positives / samples:.5f} (expected {expected:.5f}) over {samples} passwords")
+    print(f"Lookup {elapsed / samples * 1e6:.2f} us (SHA-1 included)")
+
+    if corpus:
+        missing = sum(1 for digest in read_digests(corpus, plain) if digest not in bloom)
+        print(f"Corpus entries not found: {missing}")
+        if missing:
+            sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Breached password filter")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="Build a filter file from a corpus")
+    compile_parser.add_argument("corpus")
+    compile_parser.add_argument("output")
+    compile_parser.add_argument("--error-rate", type=float, default=0.001)
+    compile_parser.add_argument("--plain", action="store_true", help="The corpus holds plain passwords")
+
+    bench_parser = commands.add_parser("bench", help="Measure the false positive rate and lookup latency")
+    bench_parser.add_argument("filter")
+    bench_parser.add_argument("--samples", type=int, default=200000)
+    bench_parser.add_argument("--corpus", default="", help="Also check that every corpus entry is found")
+    bench_parser.add_argument("--plain", action="store_true", help="The corpus holds plain passwords")
+
+    args = parser.parse_args()
+    if args.command == "compile":
+        compile_filter(args.corpus, args.output, args.error_rate, args.plain)
+    else:
+        bench(args.filter, args.samples, args.corpus, args.plain)
+
+if __name__ == "__main__":
+    main()
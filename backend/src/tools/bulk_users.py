@@ -0,0 +1,254 @@
+"""
+Bulk import and export of user accounts through Postgres COPY.
+
+    python -m tools.bulk_users import users.csv [--workers 8] [--chunk-size 5000]
+    python -m tools.bulk_users export users.ndjson
+
+Files are CSV (with a header) or NDJSON, picked from the extension or --format.
+One record per line with the columns below; a user with several OAuth accounts
+spans several records sharing the same email. Records carry either a plain
+`password`, hashed in parallel across a process pool, or a ready `password_hash`.
+Emails already present in the database (or earlier in the file) are skipped;
+their OAuth accounts are still attached, as the OAuth callbacks would.
+"""
+import argparse
+import asyncio
+import csv
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+
+from internal.auth.security import get_password_hash
+from internal.database.database import engine
+
+# Columns of the import/export format
+COLUMNS = [
+    "email",
+    "username",
+    "full_name",
+    "avatar_url",
+    "is_active",
+    "is_verified",
+    "password",
+    "password_hash",
+    "provider",
+    "provider_user_id",
+    "provider_email",
+]
+
+# Staging table the records are copied into before being merged
+STAGING_TABLE = "users_import"
+STAGING_COLUMNS = [
+    "row_number",
+    "id",
+    "email",
+    "username",
+    "full_name",
+    "avatar_url",
+    "is_active",
+    "is_verified",
+    "password_hash",
+    "provider",
+    "provider_user_id",
+    "provider_email",
+]
+
+CREATE_STAGING_TABLE = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    row_number BIGINT,
+    id UUID,
+    email VARCHAR(255),
+    username VARCHAR(100),
+    full_name VARCHAR(255),
+    avatar_url TEXT,
+    is_active BOOLEAN,
+    is_verified BOOLEAN,
+    password_hash VARCHAR(255),
+    provider VARCHAR(50),
+    provider_user_id VARCHAR(255),
+    provider_email VARCHAR(255)
+)
+"""
+
+# New users (first record of each email wins) and their passwords
+MERGE_USERS = f"""
+WITH inserted AS (
+    INSERT INTO users (id, email, username, full_name, avatar_url, is_active, is_verified)
+    SELECT DISTINCT ON (email) id, email, username, full_name, avatar_url, is_active, is_verified
+    FROM {STAGING_TABLE}
+    ORDER BY email, row_number
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id
+), passwords AS (
+    INSERT INTO user_passwords (id, user_id, password_hash)
+    SELECT gen_random_uuid(), s.id, s.password_hash
+    FROM inserted i
+    JOIN {STAGING_TABLE} s ON s.id = i.id
+    WHERE s.password_hash IS NOT NULL
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM inserted) AS users, (SELECT count(*) FROM passwords) AS passwords
+"""
+
+MERGE_OAUTH_ACCOUNTS = f"""
+INSERT INTO oauth_accounts (id, user_id, provider, provider_user_id, provider_email)
+SELECT gen_random_uuid(), u.id, s.provider, s.provider_user_id, s.provider_email
+FROM {STAGING_TABLE} s
+JOIN users u ON u.email = s.email
+WHERE s.provider IS NOT NULL AND s.provider_user_id IS NOT NULL
+ON CONFLICT (provider, provider_user_id) DO NOTHING
+"""
+
+EXPORT_QUERY = """
+SELECT u.email, u.username, u.full_name, u.avatar_url, u.is_active, u.is_verified,
+       NULL AS password, p.password_hash, o.provider, o.provider_user_id, o.provider_email
+FROM users u
+LEFT JOIN LATERAL (
+    SELECT password_hash FROM user_passwords
+    WHERE user_id = u.id
+    ORDER BY updated_at DESC
+    LIMIT 1
+) p ON true
+LEFT JOIN oauth_accounts o ON o.user_id = u.id
+ORDER BY u.created_at, u.id
+"""
+
+def detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+def read_records(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Read records lazily from a CSV or NDJSON file."""
+    with open(path, newline="" if fmt == "csv" else None) as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+
+def chunked(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _bool(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "t", "1", "yes")
+
+def to_staging_rows(chunk: List[Dict[str, Any]], first_row_number: int, pool: ProcessPoolExecutor) -> List[tuple]:
+    """Normalize a chunk of records and hash the plain passwords in parallel."""
+    to_hash = [
+        index for index, record in enumerate(chunk)
+        if _text(record.get("password")) and not _text(record.get("password_hash"))
+    ]
+    hashes = dict(zip(to_hash, pool.map(get_password_hash, [chunk[i]["password"] for i in to_hash], chunksize=64)))
+
+    rows = []
+    for index, record in enumerate(chunk):
+        email = _text(record.get("email"))
+        if email is None:
+            continue
+        rows.append((
+            first_row_number + index,
+            uuid.uuid4(),
+            email,
+            _text(record.get("username")),
+            _text(record.get("full_name")),
+            _text(record.get("avatar_url")),
+            _bool(record.get("is_active"), True),
+            _bool(record.get("is_verified"), False),
+            hashes.get(index) or _text(record.get("password_hash")),
+            _text(record.get("provider")),
+            _text(record.get("provider_user_id")),
+            _text(record.get("provider_email")),
+        ))
+    return rows
+
+async def import_users(path: str, fmt: str, workers: int, chunk_size: int):
+    """Load a file of users through COPY, one transaction per chunk."""
+    totals = {"records": 0, "users": 0, "passwords": 0, "oauth_accounts": 0}
+    started = time.perf_counter()
+
+    # Workers start on the first chunk, once the connection is open: spawned
+    # rather than forked, they never inherit its socket or the event loop
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            pg = raw.driver_connection
+            await pg.execute(CREATE_STAGING_TABLE)
+
+            row_number = 0
+            for chunk in chunked(read_records(path, fmt), chunk_size):
+                rows = await asyncio.get_running_loop().run_in_executor(
+                    None, to_staging_rows, chunk, row_number, pool
+                )
+                row_number += len(chunk)
+
+                async with pg.transaction():
+                    await pg.copy_records_to_table(STAGING_TABLE, records=rows, columns=STAGING_COLUMNS)
+                    merged = await pg.fetchrow(MERGE_USERS)
+                    status = await pg.execute(MERGE_OAUTH_ACCOUNTS)
+                    await pg.execute(f"TRUNCATE {STAGING_TABLE}")
+
+                totals["records"] += len(chunk)
+                totals["users"] += merged["users"]
+                totals["passwords"] += merged["passwords"]
+                totals["oauth_accounts"] += int(status.split()[-1])
+                print(f"{totals['records']} records read, {totals['users']} users created")
+
+    elapsed = time.perf_counter() - started
+    print(f"Imported {totals} in {elapsed:.1f}s ({totals['records'] / max(elapsed, 1e-9):.0f} records/s)")
+
+async def export_users(path: str, fmt: str):
+    """Write every user in the import format."""
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        pg = raw.driver_connection
+        if fmt == "csv":
+            # The server formats the CSV itself
+            await pg.copy_from_query(EXPORT_QUERY, output=path, format="csv", header=True)
+            return
+
+        with open(path, "wb") as f:
+            async with pg.transaction():
+                async for record in pg.cursor(EXPORT_QUERY, prefetch=5000):
+                    f.write(orjson.dumps(dict(record)) + b"\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export users with Postgres COPY")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Password hashing processes")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Records per COPY and transaction")
+    args = parser.parse_args()
+
+    fmt = detect_format(args.path, args.format)
+    if args.command == "import":
+        asyncio.run(import_users(args.path, fmt, args.workers, args.chunk_size))
+    else:
+        asyncio.run(export_users(args.path, fmt))
+
+if __name__ == "__main__":
+    main()
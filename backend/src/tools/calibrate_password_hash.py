@@ -0,0 +1,27 @@
+"""
+Find Argon2id parameters reaching a target verify latency on this machine.
+
+    python -m tools.calibrate_password_hash --target-ms 250
+
+Run it on the production hardware and set the printed values in the environment.
+"""
+import argparse
+
+from internal.auth.password_hashing import calibrate_argon2
+from internal.config.config import ARGON2_MAX_MEMORY_COST, ARGON2_PARALLELISM, PASSWORD_HASH_TARGET_MS
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate Argon2id password hashing")
+    parser.add_argument("--target-ms", type=float, default=PASSWORD_HASH_TARGET_MS)
+    parser.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM)
+    parser.add_argument("--max-memory-cost", type=int, default=ARGON2_MAX_MEMORY_COST, help="KiB")
+    args = parser.parse_args()
+
+    time_cost, memory_cost, elapsed = calibrate_argon2(args.target_ms, args.parallelism, args.max_memory_cost)
+    print(f"# verify takes {elapsed:.1f} ms")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Query plan regression check for the hot authentication queries.
+
+    python -m tools.check_query_plans [--users 200000] [--fail-on-duplicates]
+
+Seeds realistic row counts into the configured (local) database inside a
+transaction, runs EXPLAIN (ANALYZE, BUFFERS) on every hot query and rolls
+everything back. Exits with status 1 when a hot query falls back to a
+sequential scan (partitions count as their table) or visits every partition
+of a partitioned table, so it can gate CI. It also reports duplicate indexes
+(same table, columns a prefix of another index) and indexes never scanned
+according to pg_stat_user_indexes.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from internal.auth.security import AUTH_USER_COLUMNS, login_query
+from internal.database.database import engine
+from internal.database.models import utcnow, OAuthAccount, User, UserSession
+from internal.database.partitions import LIST_PARTITIONS, create_partition_sql
+
+# Tables the hot queries must reach through an index
+HOT_TABLES = {"users", "user_passwords", "oauth_accounts", "user_sessions"}
+# Hot queries allowed to visit every partition of a partitioned table
+SPANS_ALL_PARTITIONS = {
+    # A user's sessions may expire on any day, it is one index probe per partition
+    "sessions: by user",
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, full_name, is_active, is_verified, created_at)
+    SELECT gen_random_uuid(), 'seed-' || n || '@example.com', 'Seed User ' || n, n % 50 <> 0, n % 3 = 0,
+           now() - (n || ' seconds')::interval
+    FROM generate_series(1, :users) AS n
+    """,
+    """
+    INSERT INTO user_passwords (user_id, password_hash)
+    SELECT id, '$argon2id$v=19$m=19456,t=2,p=1$seed$seed' FROM users WHERE email LIKE 'seed-%'
+    """,
+    """
+    INSERT INTO oauth_accounts (user_id, provider, provider_user_id, provider_email)
+    SELECT id, (ARRAY['google', 'microsoft', 'facebook', 'strava'])[1 + abs(hashtext(email)) % 4], 'seed-' || id, email
+    FROM users WHERE email LIKE 'seed-%' AND abs(hashtext(email)) % 2 = 0
+    """,
+    """
+    INSERT INTO user_sessions (user_id, session_token, expires_at)
+    SELECT id, gen_random_uuid()::text, now() + ((1 + abs(hashtext(email)) % 144) || ' hours')::interval
+    FROM users WHERE email LIKE 'seed-%' AND abs(hashtext(email)) % 5 = 0
+    """,
+]
+
+DUPLICATE_INDEX_SQL = text("""
+SELECT t.relname AS table_name, i.relname AS index_name, x.indkey::int2[] AS columns,
+       x.indisunique AS is_unique, x.indpred IS NULL AND x.indexprs IS NULL AS is_plain
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_class t ON t.oid = x.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+WHERE n.nspname = 'public' AND t.relkind IN ('r', 'p')
+""")
+
+UNUSED_INDEX_SQL = text("""
+SELECT s.relname AS table_name, s.indexrelname AS index_name, s.idx_scan
+FROM pg_stat_user_indexes s
+JOIN pg_index x ON x.indexrelid = s.indexrelid
+WHERE s.idx_scan = 0 AND NOT x.indisunique AND NOT x.indisprimary
+ORDER BY s.relname, s.indexrelname
+""")
+
+def hot_queries(sample: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """The statements issued on the hot paths, bound to seeded values."""
+    return [
+        ("register: user by email", select(User.id).where(User.email == sample["email"])),
+        ("login: user and password by email", login_query(sample["email"])),
+        ("get_current_user: user by id", select(*AUTH_USER_COLUMNS).where(User.id == sample["user_id"])),
+        ("oauth callbacks: account by provider id", select(OAuthAccount).where(
+            OAuthAccount.provider == sample["provider"],
+            OAuthAccount.provider_user_id == sample["provider_user_id"]
+        )),
+        ("sessions: by token", select(UserSession).where(
+            UserSession.session_token == sample["session_token"],
+            UserSession.expires_at > func.now()
+        )),
+        ("sessions: by user", select(UserSession).where(UserSession.user_id == sample["session_user_id"])),
+    ]
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def walk_plan(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+def find_duplicate_indexes(rows) -> List[Tuple[str, str, str]]:
+    """(table, redundant index, covering index) for plain indexes whose columns prefix another's."""
+    duplicates = []
+    for row in rows:
+        if row.is_unique or not row.is_plain:
+            continue
+        for other in rows:
+            if other.index_name == row.index_name or other.table_name != row.table_name or not other.is_plain:
+                continue
+            if list(other.columns[:len(row.columns)]) == list(row.columns):
+                duplicates.append((row.table_name, row.index_name, other.index_name))
+                break
+    return duplicates
+
+async def run(users: int, fail_on_duplicates: bool) -> int:
+    failures = 0
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            today = utcnow().date()
+            # Yesterday's partition too, as found until the next maintenance run drops it,
+            # so queries on live sessions show that they prune expired partitions
+            for offset in range(-1, 8):
+                await conn.execute(text(create_partition_sql(today + timedelta(days=offset))))
+            print(f"Seeding {users} users...")
+            for sql in SEED_SQL:
+                await conn.execute(text(sql), {"users": users} if ":users" in sql else {})
+            await conn.execute(text("ANALYZE users, user_passwords, oauth_accounts, user_sessions"))
+
+            sample = dict((await conn.execute(text("""
+                SELECT u.email, u.id AS user_id, o.provider, o.provider_user_id,
+                       s.session_token, s.user_id AS session_user_id
+                FROM users u
+                JOIN oauth_accounts o ON o.user_id = u.id
+                JOIN user_sessions s ON s.user_id = u.id
+                WHERE u.email LIKE 'seed-%'
+                LIMIT 1
+            """))).mappings().one())
+
+            # Partitions appear in plans under their own name, map them to their table
+            partitions = {
+                table: {row.relname for row in await conn.execute(LIST_PARTITIONS, {"parent": table})}
+                for table in HOT_TABLES
+            }
+            parent_of = {partition: table for table, names in partitions.items() for partition in names}
+
+            for name, stmt in hot_queries(sample):
+                result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compile_sql(stmt)}"))
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                root = plan[0]["Plan"]
+                nodes = list(walk_plan(root))
+                relations = [node["Relation Name"] for node in nodes if "Relation Name" in node]
+                seq_scans = [
+                    node["Relation Name"] for node in nodes
+                    if node["Node Type"] == "Seq Scan"
+                    and parent_of.get(node.get("Relation Name"), node.get("Relation Name")) in HOT_TABLES
+                ]
+                unpruned = [
+                    table for table, names in partitions.items()
+                    if len(names) > 1 and names <= set(relations) and name not in SPANS_ALL_PARTITIONS
+                ]
+                scans = sorted({f"{node['Node Type']} on {node.get('Index Name') or node.get('Relation Name')}"
+                                for node in nodes if "Relation Name" in node})
+                buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+                status = "FAIL" if seq_scans or unpruned else "ok"
+                print(f"[{status:4}] {name}: {plan[0]['Execution Time']:.3f} ms, {buffers} buffers, {', '.join(scans)}")
+                for table in unpruned:
+                    print(f"       visits all {len(partitions[table])} partitions of {table}")
+                if seq_scans or unpruned:
+                    failures += 1
+
+            duplicates = find_duplicate_indexes((await conn.execute(DUPLICATE_INDEX_SQL)).all())
+            for table, index, covering in duplicates:
+                print(f"[dup ] {table}.{index} is covered by {covering}")
+
+            for row in (await conn.execute(UNUSED_INDEX_SQL)).all():
+                print(f"[idle] {row.table_name}.{row.index_name} was never scanned since the stats reset")
+        finally:
+            # Nothing seeded survives the check
+            await transaction.rollback()
+
+    if fail_on_duplicates and duplicates:
+        failures += len(duplicates)
+    return 1 if failures else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the hot queries stay on index scans")
+    parser.add_argument("--users", type=int, default=200000, help="Users to seed")
+    parser.add_argument("--fail-on-duplicates", action="store_true")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.users, args.fail_on_duplicates)))
+
+if __name__ == "__main__":
+    main()
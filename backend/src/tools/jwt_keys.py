@@ -0,0 +1,83 @@
+"""
+Manage the asymmetric JWT signing keys.
+
+    python -m tools.jwt_keys generate   # add a new key, it signs once its activation delay elapsed
+    python -m tools.jwt_keys prune      # delete keys superseded longer than the token lifetime
+    python -m tools.jwt_keys list
+"""
+import argparse
+import os
+import secrets
+import time
+from datetime import datetime
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from internal.auth.keys import (
+    ASYMMETRIC_ALGORITHMS,
+    KEY_RETIREMENT_OVERLAP_SECONDS,
+    load_signing_keys,
+    retired_keys,
+    select_signing_key,
+)
+from internal.config.config import JWT_ALGORITHM, JWT_KEYS_DIR, JWT_KEY_ACTIVATION_DELAY_SECONDS
+
+# Curve used by each elliptic-curve algorithm
+EC_CURVES = {
+    "ES256": ec.SECP256R1,
+    "ES384": ec.SECP384R1,
+    "ES512": ec.SECP521R1,
+}
+
+def generate_private_key(algorithm: str):
+    """Generate a private key for the given JWT algorithm."""
+    if algorithm in EC_CURVES:
+        return ec.generate_private_key(EC_CURVES[algorithm]())
+    return rsa.generate_private_key(public_exponent=65537, key_size=3072)
+
+def generate(keys_dir: str, algorithm: str) -> str:
+    """Write a new private key to the key directory and return its kid."""
+    os.makedirs(keys_dir, exist_ok=True)
+    kid = f"{datetime.utcnow():%Y%m%d%H%M%S}-{secrets.token_hex(4)}"
+    pem = generate_private_key(algorithm).private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    path = os.path.join(keys_dir, f"{kid}.pem")
+    # Private keys are only readable by the owner
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return kid
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys")
+    parser.add_argument("command", choices=["generate", "prune", "list"])
+    parser.add_argument("--keys-dir", default=JWT_KEYS_DIR)
+    parser.add_argument("--algorithm", default=JWT_ALGORITHM)
+    args = parser.parse_args()
+
+    if args.algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise SystemExit(f"JWT_ALGORITHM must be one of {sorted(ASYMMETRIC_ALGORITHMS)} to use signing keys")
+
+    if args.command == "generate":
+        print(generate(args.keys_dir, args.algorithm))
+        return
+
+    now = time.time()
+    keys = load_signing_keys(args.keys_dir, args.algorithm)
+    if args.command == "prune":
+        for key in retired_keys(keys, now, JWT_KEY_ACTIVATION_DELAY_SECONDS, KEY_RETIREMENT_OVERLAP_SECONDS):
+            os.remove(key.path)
+            print(f"removed {key.kid}")
+        return
+
+    signing = select_signing_key(keys, now, JWT_KEY_ACTIVATION_DELAY_SECONDS)
+    for key in keys:
+        marker = "*" if key is signing else " "
+        print(f"{marker} {key.kid}  created {datetime.utcfromtimestamp(key.created_at):%Y-%m-%d %H:%M:%S}")
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,26 @@
 
 import React from 'react';
 import ProtectedRoute, { useAuth } from '@/components/auth/ProtectedRoute';
+import { resolveBackendUrl } from '@/lib/apiClient';
 import styles from "./page.module.css";
 
 function DashboardContent() {
-    const { user, clearToken } = useAuth();
+    const { user, token, clearToken } = useAuth();
 
-    const handleLogout = () => {
+    const handleLogout = async () => {
+        // Revoke the token server-side, the local logout happens regardless
+        if (token) {
+            try {
+                await fetch(resolveBackendUrl('/auth/logout'), {
+                    method: 'POST',
+                    headers: {
+                        'Authorization': `Bearer ${token}`
+                    }
+                });
+            } catch (error) {
+                console.error('Failed to revoke token:', error);
+            }
+        }
         clearToken();
         window.location.href = '/login';
     };